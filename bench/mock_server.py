@@ -0,0 +1,281 @@
+"""Local stand-in of the scoreboard API fed by a synthetic competition.
+
+Serves the endpoints used by the tool (team/table, team/chart, chart/{round}, table/{round}) and a POST /webhook that
+collects the alerts of the webhook sink:
+
+    python bench/mock_server.py --teams 50 --rounds 500 --port 8000 --period 120
+
+then set "address": "127.0.0.1:8000" in config.json.
+"""
+import argparse
+import json
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Services of test.py, extended with generated names when more are requested
+SERVICES = ['Inlook-1', 'Inlook-2', 'CCalendar-1', 'CCalendar-2', 'CCForms-1', 'CCForms-2', 'ExCCel-1', 'ExCCel-2']
+
+UP = 101
+DOWN_CODES = (102, 103, 104)
+
+
+class SyntheticScoreboard:
+    """Synthetic competition, the random walks of generate_fake_data (test.py) vectorized with NumPy.
+
+    The total score of every team is generated up front (teams x rounds, needed for the positions), the data of the
+    services of a team is generated the first time the team is requested, with a generator seeded by the team, so the
+    same parameters always produce the same competition.
+
+    Args:
+        teams: int: Number of teams
+        services: int: Number of services
+        rounds: int: Number of rounds of the competition
+        seed: int: Seed of the competition
+        down_rate: float: Probability that a service is down in a round
+        start_round: int: Current round at the start
+        period: float: Seconds of a round (0 for move to the next round only with advance())
+    """
+
+    def __init__(self, teams: int = 50, services: int = 8, rounds: int = 500, seed: int = 0, down_rate: float = 0.1,
+                 start_round: int = 0, period: float = 0):
+        self.teams = [f"team{index:03d}" for index in range(teams)]
+        self.team_index = {team: index for index, team in enumerate(self.teams)}
+        self.services = (SERVICES + [f"Service-{index}" for index in range(len(SERVICES), services)])[:services]
+        self.rounds = rounds
+        self.seed = seed
+        self.down_rate = down_rate
+
+        self.start_round = start_round
+        self.period = period
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.alerts = []
+
+        # Total score: random walk from 10_000 per service with steps of at most 5000, never negative
+        rng = np.random.default_rng([seed, teams])
+        steps = rng.integers(-5000, 5001, size=(teams, rounds))
+        steps[:, 0] = 10_000 * services
+        self.score = np.maximum(np.cumsum(steps, axis=1), 0)
+        # Position 1 for the best score of every round
+        order = np.argsort(-self.score, axis=0, kind="stable")
+        self.position = np.empty_like(order)
+        np.put_along_axis(self.position, order, np.arange(1, teams + 1)[:, None], axis=0)
+
+        self.fragments = {}
+
+    # * ------------------ Data ------------------
+
+    def current_round(self) -> int:
+        """Last round of the competition (the tables have rounds 0..current_round)"""
+        elapsed = int((time.time() - self.started) / self.period) if self.period else 0
+        return min(self.start_round + elapsed, self.rounds - 1)
+
+    def advance(self, rounds: int = 1) -> int:
+        """Move the competition forward (for the benchmarks)
+        Args:
+            rounds: int: Number of rounds
+
+        Returns:
+            int: New current round
+        """
+
+        self.start_round = min(self.start_round + rounds, self.rounds - 1)
+        return self.current_round()
+
+    @lru_cache(maxsize=None)
+    def team_data(self, team: str) -> dict:
+        """Per-service data of a team, generated the first time it is requested
+        Args:
+            team: str: Name of the team
+
+        Returns:
+            dict: Arrays rounds x services: score, sla, stolen, lost, status
+        """
+
+        index = self.team_index[team]
+        rng = np.random.default_rng([self.seed, index])
+        shape = (self.rounds, len(self.services))
+
+        # Score of the team divided between the services with fixed random shares
+        shares = rng.dirichlet(np.ones(len(self.services)))
+        score = np.rint(self.score[index][:, None] * shares[None, :]).astype(np.int64)
+
+        sla_steps = rng.uniform(-0.30, 0.30, size=shape)
+        sla_steps[0] = 0
+        sla = np.clip(100 + np.cumsum(sla_steps, axis=0), 0, 100).round(2)
+
+        value = 10 * len(self.services)
+        stolen = np.cumsum(rng.integers(0, value + 1, size=shape), axis=0)
+        lost = np.cumsum(rng.integers(0, value + 1, size=shape), axis=0)
+
+        status = np.where(rng.random(shape) < self.down_rate, rng.choice(DOWN_CODES, size=shape), UP)
+
+        return {"score": score, "sla": sla, "stolen": stolen, "lost": lost, "status": status}
+
+    def service_round(self, data: dict, round: int, column: int) -> dict:
+        """Service of a round in the format of the team table"""
+        status = int(data["status"][round, column])
+        return {
+            "shortname": self.services[column],
+            "checks": [{"exitCode": status, "stdout": "OK" if status == UP else "Service is down",
+                        "action": "CHECK_SLA"}],
+            "stolen": int(data["stolen"][round, column]),
+            "lost": int(data["lost"][round, column]),
+            "score": int(data["score"][round, column]),
+            "sla": float(data["sla"][round, column]),
+        }
+
+    def round_fragments(self, team: str, last_round: int) -> list[bytes]:
+        """Encoded rounds of the team table up to last_round (encoded once and reused by the next requests)"""
+
+        with self.lock:
+            fragments = self.fragments.setdefault(team, [])
+            if len(fragments) <= last_round:
+                data = self.team_data(team)
+                index = self.team_index[team]
+                for round in range(len(fragments), last_round + 1):
+                    fragments.append(json.dumps({
+                        "round": round,
+                        "position": int(self.position[index, round]),
+                        "score": int(self.score[index, round]),
+                        "services": [self.service_round(data, round, column) for column in range(len(self.services))],
+                    }).encode())
+            return fragments[:last_round + 1]
+
+    # * ------------------ Documents ------------------
+
+    def team_table(self, team: str, last_round: int) -> bytes:
+        header = json.dumps({"teamShortname": team, "services": [{"shortname": service} for service in self.services]})
+        return header[:-1].encode() + b', "rounds": [' + b", ".join(self.round_fragments(team, last_round)) + b"]}"
+
+    def team_chart(self, team: str, last_round: int) -> bytes:
+        score = self.team_data(team)["score"]
+        return json.dumps({
+            "rounds": last_round,
+            "services": [{"shortname": service, "score": score[:last_round + 1, column].tolist()}
+                         for column, service in enumerate(self.services)],
+        }).encode()
+
+    @lru_cache(maxsize=8)
+    def global_chart(self, round: int) -> bytes:
+        return json.dumps({
+            "rounds": round,
+            "teams": [{"shortname": team, "score": self.score[index, :round + 1].tolist(),
+                       "position": self.position[index, :round + 1].tolist()}
+                      for index, team in enumerate(self.teams)],
+        }).encode()
+
+    @lru_cache(maxsize=8)
+    def global_table(self, round: int) -> bytes:
+        teams = sorted(range(len(self.teams)), key=lambda index: self.position[index, round])
+        return json.dumps({
+            "round": round,
+            "teams": [{
+                "shortname": self.teams[index],
+                "position": int(self.position[index, round]),
+                "score": int(self.score[index, round]),
+                "services": [self.service_round(self.team_data(self.teams[index]), round, column)
+                             for column in range(len(self.services))],
+            } for index in teams],
+        }).encode()
+
+    def document(self, path: str) -> tuple[bytes, str] | None:
+        """Body and ETag of a path of the API, None if the path does not exist"""
+
+        parts = path.split("?")[0].removeprefix("/api/scoreboard/").split("/")
+        current = self.current_round()
+        if len(parts) == 3 and parts[0] == "team" and parts[2] in self.team_index:
+            if parts[1] == "table":
+                return self.team_table(parts[2], current), f'"{parts[2]}-{current}"'
+            if parts[1] == "chart":
+                return self.team_chart(parts[2], current), f'"{parts[2]}-{current}"'
+        if len(parts) == 2 and parts[0] in ("chart", "table") and parts[1].isdigit() and int(parts[1]) <= current:
+            round = int(parts[1])
+            body = self.global_chart(round) if parts[0] == "chart" else self.global_table(round)
+            return body, f'"{parts[0]}-{round}"'
+        return None
+
+
+class ScoreboardHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        document = self.server.scoreboard.document(self.path)
+        if document is None:
+            self.reply(404, b'{"error": "not found"}')
+            return
+
+        body, etag = document
+        if self.headers.get("If-None-Match") == etag:
+            self.reply(304, b"", etag)
+            return
+        self.reply(200, body, etag)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/webhook":
+            self.reply(404, b'{"error": "not found"}')
+            return
+        self.server.scoreboard.alerts.append(json.loads(body))
+        self.reply(204, b"")
+
+    def reply(self, status: int, body: bytes, etag: str = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(scoreboard: SyntheticScoreboard, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the server in a background thread
+    Args:
+        scoreboard: SyntheticScoreboard: Competition served
+        port: int: Port (0 for a free port, read it from server.server_port)
+        host: str: Address
+
+    Returns:
+        ThreadingHTTPServer: The server (server.shutdown() for stop it)
+    """
+
+    server = ThreadingHTTPServer((host, port), ScoreboardHandler)
+    server.daemon_threads = True
+    server.scoreboard = scoreboard
+    threading.Thread(target=server.serve_forever, name="mock-scoreboard", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=50, help="Number of teams (up to 500)")
+    parser.add_argument("--services", type=int, default=8, help="Number of services")
+    parser.add_argument("--rounds", type=int, default=500, help="Number of rounds (up to 2000)")
+    parser.add_argument("--start-round", type=int, default=0, help="Current round at the start")
+    parser.add_argument("--period", type=float, default=120, help="Seconds of a round, 0 for a frozen competition")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the competition")
+    parser.add_argument("--port", type=int, default=8000, help="Port of the server")
+    args = parser.parse_args()
+
+    scoreboard = SyntheticScoreboard(teams=args.teams, services=args.services, rounds=args.rounds, seed=args.seed,
+                                     start_round=args.start_round, period=args.period)
+    server = serve(scoreboard, port=args.port)
+    print(f"Serving {args.teams} teams on http://127.0.0.1:{server.server_port}/api/scoreboard/ "
+          f"(teams: {', '.join(scoreboard.teams[:3])}...)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
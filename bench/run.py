@@ -0,0 +1,151 @@
+"""Offline benchmarks of the monitor and of the report against the local mock scoreboard (bench/mock_server.py).
+
+Measures the first tick, the ticks without a new round (conditional requests) and with a new round, the download of
+the global table and the generation of plots and report, and prints the results as JSON for regression tracking:
+
+    python bench/run.py --teams 500 --rounds 2000 --targets 10 --output results.json
+
+Everything runs in a temporary directory with its own config.json, the report files are written there.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from mock_server import SyntheticScoreboard, serve
+from startup import ROOT, summary
+
+sys.path.insert(0, ROOT)
+
+
+def timed(function, *args, **kwargs) -> float:
+    """Duration in seconds of a call"""
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def bench_ticks(scoreboard: SyntheticScoreboard, targets: list[str], ticks: int, workers: int) -> dict:
+    """Ticks of SLANotifier: the first one, then alternately without and with a new round"""
+
+    from lib.notifier import NotificationDispatcher
+    from main import SLANotifier
+
+    notifier = SLANotifier(create_report=False, target_team=targets, fetch_workers=workers,
+                           notifier=NotificationDispatcher([]))
+    first = timed(notifier.tick)
+
+    unchanged, new_round = [], []
+    for _ in range(ticks):
+        unchanged.append(timed(notifier.tick))
+        scoreboard.advance()
+        new_round.append(timed(notifier.tick))
+
+    notifier.api.http.close()
+    notifier.notifier.close()
+    return {
+        "first_tick": summary([first]),
+        "tick_unchanged": summary(unchanged),
+        "tick_new_round": summary(new_round),
+        "downtime_count": sum(notifier.downtime_count.values()),
+    }
+
+
+def bench_global(scoreboard: SyntheticScoreboard, runs: int) -> dict:
+    """Download and decode of the global table and chart of the current round"""
+
+    from lib.API import API
+
+    api = API()
+    round_number = scoreboard.current_round()
+    return {
+        "global_table": summary([timed(api.get_global_table, round_number) for _ in range(runs)]),
+        "global_chart": summary([timed(api.get_global_chart, round_number) for _ in range(runs)]),
+    }
+
+
+def bench_report(scoreboard: SyntheticScoreboard, teams: list[str]) -> dict:
+    """Full report: download of the history, plots and markdown"""
+
+    from lib.statistic_manager import StatisticManager
+
+    start = time.perf_counter()
+    statistic = StatisticManager(teams_name=teams, downtime_count={team: 0 for team in teams},
+                                 services=scoreboard.services)
+    setup = time.perf_counter() - start
+    plots = timed(statistic.generate_plots)
+    report = timed(statistic.generate_report)
+    statistic.file_report.close()
+    return {
+        "report_setup": summary([setup]),
+        "report_plots": summary([plots]),
+        "report_markdown": summary([report]),
+        "report_total": summary([setup + plots + report]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=50, help="Teams of the competition (up to 500)")
+    parser.add_argument("--services", type=int, default=8, help="Services of the competition")
+    parser.add_argument("--rounds", type=int, default=500, help="Rounds of the competition (up to 2000)")
+    parser.add_argument("--targets", type=int, default=5, help="Teams monitored by SLANotifier")
+    parser.add_argument("--ticks", type=int, default=10, help="Ticks with a new round (and as many without)")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="fetch_workers of SLANotifier")
+    parser.add_argument("--plot-workers", type=int, default=4, help="plot_workers of the report")
+    parser.add_argument("--report-teams", type=int, default=2, help="Teams in the report, 0 for skip the report")
+    parser.add_argument("--runs", type=int, default=5, help="Downloads of the global documents")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the competition")
+    parser.add_argument("--output", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    args.ticks = min(args.ticks, args.rounds - 1)
+    output_path = os.path.abspath(args.output) if args.output else None
+    scoreboard = SyntheticScoreboard(teams=args.teams, services=args.services, rounds=args.rounds, seed=args.seed,
+                                     start_round=args.rounds - 1 - args.ticks)
+    server = serve(scoreboard)
+    targets = scoreboard.teams[:args.targets]
+
+    workdir = tempfile.mkdtemp(prefix="slanotifier-bench-")
+    with open(os.path.join(workdir, "config.json"), "w") as f:
+        json.dump({
+            "logging_level": "ERROR",
+            "targets": targets,
+            "reload": 120,
+            "report": False,
+            "address": f"127.0.0.1:{server.server_port}",
+            "fetch_workers": args.fetch_workers,
+            "plot_workers": args.plot_workers,
+            "report_bundle": True,
+            "plot_points": 1000,
+            "downsample": "minmax",
+        }, f)
+    os.chdir(workdir)
+
+    from lib.logger import set_level
+
+    set_level("ERROR")
+
+    results = bench_ticks(scoreboard, targets, args.ticks, args.fetch_workers)
+    results.update(bench_global(scoreboard, args.runs))
+    if args.report_teams:
+        results.update(bench_report(scoreboard, scoreboard.teams[:args.report_teams]))
+    server.shutdown()
+
+    output = {
+        "params": {key: value for key, value in vars(args).items() if key != "output"},
+        "python": platform.python_version(),
+        "workdir": workdir,
+        "results": results,
+    }
+    print(json.dumps(output, indent=2))
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(output, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
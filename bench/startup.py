@@ -0,0 +1,87 @@
+"""Startup benchmark: time to import main.py and time to complete the first tick.
+
+Run from the directory that contains config.json (usually the root of the repository):
+
+    python bench/startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+FIRST_TICK_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from main import SLANotifier
+from lib.notifier import NotificationDispatcher
+imported = time.perf_counter()
+targets = json.loads(sys.argv[1])
+notifier = SLANotifier(create_report=False, target_team=targets, fetch_workers=len(targets),
+                       notifier=NotificationDispatcher([]))
+notifier.tick()
+print(json.dumps({"import": imported - start, "first_tick": time.perf_counter() - imported}))
+"""
+
+
+def run_python(snippet: str, *args: str) -> str:
+    """Run a snippet in a fresh interpreter (cold import) with the repository in the path.
+
+    Args:
+        snippet: str: Python code
+        *args: str: Arguments of the snippet
+
+    Returns:
+        str: Last line printed by the snippet
+    """
+
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    result = subprocess.run([sys.executable, "-c", snippet, *args], env=env, capture_output=True, text=True,
+                            check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def summary(values: list[float]) -> dict:
+    """Median, min and max of the measures in milliseconds"""
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 2),
+        "min_ms": round(min(values) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts measured")
+    parser.add_argument("--targets", nargs="*", default=None,
+                        help="Teams fetched in the first tick (targets of config.json by default), "
+                             "skip the first tick with no targets")
+    args = parser.parse_args()
+
+    if args.targets is None:
+        with open("config.json") as f:
+            args.targets = json.load(f)["targets"]
+
+    imports = [float(run_python(IMPORT_SNIPPET)) for _ in range(args.runs)]
+    results = {"import_main": summary(imports)}
+
+    if args.targets:
+        ticks = [json.loads(run_python(FIRST_TICK_SNIPPET, json.dumps(args.targets))) for _ in range(args.runs)]
+        results["first_tick"] = summary([tick["first_tick"] for tick in ticks])
+        results["import_to_first_tick"] = summary([tick["import"] + tick["first_tick"] for tick in ticks])
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
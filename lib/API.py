@@ -1,11 +1,146 @@
+from __future__ import annotations
+
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable
+
+from lib.http_client import APIError, HTTPClient
+from lib.metrics import metrics
+from lib.table_parser import parse_team_table, read_key
+from lib.utils import get_option
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from lib.round_matrix import RoundMatrix
+
+# Bodies up to this size are read to the end after a probe, so the connection goes back to the pool
+PROBE_DRAIN_LIMIT = 256 * 1024
+
+
+class ResponseCache:
+    """LRU cache of the API documents, emptied when the round of the scoreboard moves.
+
+    Args:
+        max_size: int: Maximum number of documents kept
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self.round = None
+        self.checked = None
+        self.hits = 0
+        self.misses = 0
 
-import requests
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Any:
+        """Get a document from the cache.
+        Args:
+            key: tuple: (endpoint, team or round)
+
+        Returns:
+            Any: The document or None if missing
+        """
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, value: Any) -> None:
+        """Save a document in the cache, evicting the least recently used one if full.
+        Args:
+            key: tuple: (endpoint, team or round)
+            value: Any: Document to save
+        """
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def observe_round(self, round_number: int) -> None:
+        """Invalidate the cache if the round is different from the one of the cached documents.
+        Args:
+            round_number: int: Round of a freshly downloaded document
+        """
+
+        with self._lock:
+            self.checked = time.monotonic()
+            if round_number != self.round:
+                if self.round is not None:
+                    logging.debug("Round moved from %s to %s, cache invalidated", self.round, round_number)
+                self._entries.clear()
+                self.round = round_number
+
+    def round_expired(self, ttl: float) -> bool:
+        """True if the round of the cached documents was checked more than ``ttl`` seconds ago"""
+        return self.checked is None or time.monotonic() - self.checked > ttl
+
+    def clear(self) -> None:
+        """Remove all the documents"""
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key: tuple) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return f"{len(self)}/{self.max_size} documents | hits: {self.hits} | misses: {self.misses}"
 
 
 class API:
-    def __init__(self):
-        self.address = "ad.cyberchallenge.it"
+    def __init__(self, address: str = None, cache_size: int = 0, round_ttl: float = 120):
+        self.address = address or get_option('address', "ad.cyberchallenge.it")
+        self.http = HTTPClient(self.address,
+                               timeout=get_option('timeout', 10),
+                               retries=get_option('retries', 3),
+                               pool_size=max(get_option('fetch_workers', 1), 1) * 2)
+        self.cache = ResponseCache(cache_size) if cache_size > 0 else None
+        self.round_ttl = round_ttl
+
+    def cached(self, key: tuple, fetch: Callable[[], dict], round_of: Callable[[dict], int] = None) -> dict:
+        """Return the cached document for the key or fetch it.
+        Args:
+            key: tuple: (endpoint, team or round)
+            fetch: Callable: Function that downloads the document
+            round_of: Callable: Function that extracts the round from the document, None if the document never changes
+                (the round of the documents of a team is probed again when it was checked more than round_ttl
+                seconds ago)
+
+        Returns:
+            dict: The document
+        """
+
+        if self.cache is None:
+            return fetch()
+
+        if round_of is not None and key in self.cache and self.cache.round_expired(self.round_ttl):
+            # The round may have moved since the document was cached
+            try:
+                self.cache.observe_round(self.probe_round(key[1]))
+            except (APIError, ValueError) as e:
+                logging.warning("Round of the cached documents not checked, serving them anyway: %s", e)
+        document = self.cache.get(key)
+        if document is None:
+            document = fetch()
+            if round_of is not None:
+                self.cache.observe_round(round_of(document))
+            self.cache.put(key, document)
+
+        return document
 
     def get_team_chart(self, team: str) -> dict:
         """Get the chart of the team from the API.
@@ -14,52 +149,82 @@ class API:
 
         Returns:
             dict: Data of the team
-        """
-        request = requests.get(f"http://{self.address}/api/scoreboard/team/chart/{team}")
-        if request.status_code == 200:
-            return request.json()
 
-        logging.error(
-            f"Error in the request to the API for the team chart | status: {request.status_code} | Error: {request.text}")
-
-        exit(request.status_code)
+        Raises:
+            APIError: If the request fails after the retries
+        """
+        return self.cached(("team/chart", team),
+                           lambda: self.http.get_json(f"/api/scoreboard/team/chart/{team}"),
+                           round_of=lambda document: document['rounds'])
 
-    def get_team_table(self, team: str) -> dict:
+    def get_team_table(self, team: str, conditional: bool = False, rounds: slice = None) -> dict | None:
         """Get the table of the team from the API.
 
         Args:
             team: str: Name of the team
+            conditional: bool: Return None if the table did not change since the previous conditional request
+            rounds: slice: Decode only these rounds (and only the fields used by the tool), e.g. slice(-1, None)
 
         Returns:
             dict: Data of the team
+
+        Raises:
+            APIError: If the request fails after the retries
         """
 
-        request = requests.get(f"http://{self.address}/api/scoreboard/team/table/{team}")
-        if request.status_code == 200:
-            return request.json()
+        if rounds is not None:
+            response = self.http.get(f"/api/scoreboard/team/table/{team}", conditional=conditional)
+            if response is None:
+                return None
+            with metrics.timer("decode", endpoint="team/table", team=team):
+                return parse_team_table(response.content, team, rounds)
+
+        if conditional:
+            return self.http.get_json(f"/api/scoreboard/team/table/{team}", conditional=True)
 
-        logging.error(
-            f"Error in the request to the API for the team table | status: {request.status_code} | Error: {request.text}")
+        return self.cached(("team/table", team),
+                           lambda: self.http.get_json(f"/api/scoreboard/team/table/{team}"),
+                           round_of=lambda document: len(document['rounds']) - 1)
 
-        exit(request.status_code)
+    def probe_round(self, team: str) -> int:
+        """Cheap check of the current round: read the round counter at the beginning of the team chart. The rest of a
+        small chart is drained so the connection is reused, a large one is closed without downloading the scores.
+
+        Args:
+            team: str: Name of the team
+
+        Returns:
+            int: Round of the team
+
+        Raises:
+            APIError: If the request fails after the retries
+        """
+
+        response = self.http.get(f"/api/scoreboard/team/chart/{team}", stream=True)
+        try:
+            response.raw.decode_content = True
+            return read_key(response.raw, 'rounds')
+        finally:
+            if int(response.headers.get('Content-Length', PROBE_DRAIN_LIMIT + 1)) <= PROBE_DRAIN_LIMIT:
+                response.raw.drain_conn()
+                response.raw.release_conn()
+            else:
+                response.close()
 
     def get_global_chart(self, round_number: int) -> dict:
         """Get the chart of the global scoreboard from the API.
 
         Args:
-            round_number:
+            round_number: int: Number of the round
 
         Returns:
             dict: Data of the global scoreboard
-        """
-        request = requests.get(f"http://{self.address}/api/scoreboard/chart/{round_number}")
-        if request.status_code == 200:
-            return request.json()
-
-        logging.error(
-            f"Error in the request to the API for the chart  | status: {request.status_code} | Error: {request.text}")
 
-        exit(request.status_code)
+        Raises:
+            APIError: If the request fails after the retries
+        """
+        return self.cached(("chart", round_number),
+                           lambda: self.http.get_json(f"/api/scoreboard/chart/{round_number}"))
 
     def get_global_table(self, round_number: int) -> dict:
         """Get the table of the global scoreboard from the API.
@@ -68,57 +233,62 @@ class API:
 
         Returns:
             dict: Data of the global scoreboard
+
+        Raises:
+            APIError: If the request fails after the retries
         """
 
-        request = requests.get(f"http://{self.address}/api/scoreboard/table/{round_number}")
-        if request.status_code == 200:
-            return request.json()
+        return self.cached(("table", round_number),
+                           lambda: self.http.get_json(f"/api/scoreboard/table/{round_number}"))
+
+    def get_round_matrix(self, team: str, services: list[str]) -> RoundMatrix:
+        """Get the table and the chart of the team as a RoundMatrix.
+        Args:
+            team: str: Name of the team
+            services: list: List of the services
+
+        Returns:
+            RoundMatrix: Columnar data of the team
+        """
 
-        logging.error(
-            f"Error in the request to the API for the chart  | status: {request.status_code} | Error: {request.text}")
+        # Imported here so NumPy is loaded only when the statistics are requested
+        from lib.round_matrix import RoundMatrix
 
-        exit(request.status_code)
+        return RoundMatrix(services, table=self.get_team_table(team), chart=self.get_team_chart(team))
 
-    def get_score_team(self, team: str, services: list) -> list[int]:
+    def get_score_team(self, team: str, services: list, as_array: bool = False) -> list[int] | np.ndarray:
         """Get the score of the team in the services.
         Args:
             team: str: Name of the team
             services: list: List of the services
+            as_array: bool: Return the NumPy array instead of a list
 
         Returns:
             list: List of team scores
         """
 
-        service_data = self.get_team_chart(team)
-
-        score_team = []
+        from lib.round_matrix import RoundMatrix
 
-        for round in range(int(service_data['rounds'] + 1)):
-            score_team.append(0)
-            for index, service in enumerate(services):
-                score_team[round] += service_data['services'][index]['score'][round]
+        score_team = RoundMatrix(services, chart=self.get_team_chart(team)).team_score()
 
-        return score_team
+        return score_team if as_array else score_team.tolist()
 
-    def get_score_service(self, team: str, services: list) -> dict[str, list[int]]:
+    def get_score_service(self, team: str, services: list, as_array: bool = False) -> dict[str, list[int]] | np.ndarray:
         """Score the team's services.
         Args:
             team: str: Name of the team
             services: list: List of the services
+            as_array: bool: Return the NumPy array (rounds x services) instead of a dictionary
 
         Returns:
             dict: Service Score Dictionary
         """
 
-        data = self.get_team_chart(team)
+        from lib.round_matrix import RoundMatrix, columns_to_dict
 
-        score_service = {service: [] for service in services}
+        score_service = RoundMatrix(services, chart=self.get_team_chart(team)).score
 
-        for index, service in enumerate(services):
-            for round in range(int(data['rounds'] + 1)):
-                score_service[service].append(data['services'][index]['score'][round])
-
-        return score_service
+        return score_service if as_array else columns_to_dict(score_service, services)
 
     def get_round(self, team: str) -> int:
         """Get the round of the team.
@@ -131,38 +301,30 @@ class API:
 
         return self.get_team_chart(team=team)['rounds']
 
-    def get_sla_services(self, team: str, services: list[str], rounds: list[int]) -> dict[str, list[float]]:
+    def get_sla_services(self, team: str, services: list[str], rounds: list[int],
+                         as_array: bool = False) -> dict[str, list[float]] | np.ndarray:
         """Get the SLA of the team's services.
         Args:
             team: str: Name of the team
             services: list: List of services
             rounds: list: List of the rounds
+            as_array: bool: Return the NumPy array (rounds x services) instead of a dictionary
 
         Returns:
             dict: SLA Service Dictionary
         """
 
-        sla_data = self.get_team_table(team)
-
-        sla_service = {service: [] for service in services}
-        counters = {service: 0 for service in services}
+        from lib.round_matrix import RoundMatrix, columns_to_dict
 
-        for round in rounds:
-            for index, name_service in enumerate(services):
-                service = sla_data['rounds'][round]['services'][index]
-                if all(check['exitCode'] == 101 for check in service['checks']):
-                    counters[name_service] += 1
+        sla_service = RoundMatrix(services, table=self.get_team_table(team)).sla(rounds)
 
-                logging.debug(f"Service: {service['shortname']} | {counters[name_service]} / {round + 1}")
-                sla_service[service['shortname']].append((counters[name_service] / (round + 1)) * 100)
+        logging.debug("SLA of %s computed for %d rounds", team, len(rounds))
 
-        logging.debug(sla_service)
-
-        return sla_service
+        return sla_service if as_array else columns_to_dict(sla_service, services)
 
     # True for stolen, False for lost
-    def get_flags_services(self, team: str, services: list[str], rounds: list[int], stolen_lost: bool) -> dict[
-        str, list[int]]:
+    def get_flags_services(self, team: str, services: list[str], rounds: list[int], stolen_lost: bool,
+                           as_array: bool = False) -> dict[str, list[int]] | np.ndarray:
         """Dictionary of Service Flags
 
         Args:
@@ -170,18 +332,14 @@ class API:
             services: list: List of services
             rounds: list: List of the rounds
             stolen_lost: bool: True for stolen, False for lost
+            as_array: bool: Return the NumPy array (rounds x services) instead of a dictionary
 
         Returns:
             dict: Dictionary of Service Flags
         """
 
-        service_data = self.get_team_table(team)
-
-        flags = {service: [] for service in services}
+        from lib.round_matrix import RoundMatrix, columns_to_dict
 
-        for index, service in enumerate(services):
-            for round in rounds:
-                flags[service].append(
-                    service_data['rounds'][round]['services'][index]['stolen' if stolen_lost else 'lost'])
+        flags = RoundMatrix(services, table=self.get_team_table(team)).flags(stolen_lost, rounds)
 
-        return flags
+        return flags if as_array else columns_to_dict(flags, services)
@@ -0,0 +1,51 @@
+import json
+import os
+
+from lib.logger import logging
+
+VERSION = 1
+
+
+class Checkpoint:
+    def __init__(self, path: str = "state.json"):
+        self.path = path
+
+    def save(self, state: dict) -> None:
+        """Write the state of the monitor atomically (a crash never leaves a truncated file).
+
+        Args:
+            state: dict: JSON serializable state
+        """
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": VERSION, **state}, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> dict | None:
+        """Read the state saved by the previous execution.
+
+        Returns:
+            dict: The state, None if missing, unreadable or of another version
+        """
+
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Checkpoint {self.path} not readable, starting from scratch: {e}")
+            return None
+
+        if state.get("version") != VERSION:
+            logging.warning(f"Checkpoint {self.path} has version {state.get('version')}, starting from scratch")
+            return None
+
+        return state
+
+    def remove(self) -> None:
+        """Remove the saved state"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,32 +1,158 @@
+import queue
 import sqlite3
+import threading
 
 from lib.logger import logging
+from lib.utils import serialize, deserialize
+
+COLUMNS = ("name_team", "rank_team", "score_team", "name_service", "score_service", "flags_submitted", "flags_lost",
+           "sla_value", "is_down")
 
 
 class DBManager:
-    def __init__(self):
-        self.name_db = "db.sqlite3"
+    def __init__(self, name_db: str = "db.sqlite3"):
+        self.name_db = name_db
+        self.queue = None
+        self.writer = None
         if self.init():
             logging.info("Database initialization successful")
 
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode (readers never block the writer)"""
+        conn = sqlite3.connect(self.name_db)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
     def init(self) -> bool:
         """Initialize the database"""
         try:
-            with sqlite3.connect(self.name_db) as conn:
-                cursor = conn.cursor()
-                query = '''
-                    
+            conn = self.connect()
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS records (
+                        name_team TEXT NOT NULL,
+                        rank_team INTEGER,
+                        score_team REAL,
+                        name_service TEXT NOT NULL,
+                        score_service REAL,
+                        flags_submitted INTEGER,
+                        flags_lost INTEGER,
+                        sla_value REAL,
+                        is_down INTEGER,
+                        timestamp TEXT NOT NULL
                     )
-                '''
-                cursor.execute(query)
-                conn.commit()
-                return True
-        except sqlite3.OperationalError:
+                ''')
+                conn.execute('''
+                    CREATE INDEX IF NOT EXISTS records_team_service_timestamp
+                    ON records (name_team, name_service, timestamp)
+                ''')
+            conn.close()
+            return True
+        except sqlite3.OperationalError as e:
+            logging.error(f"Error in the database initialization: {e}")
             return False
 
+    def insert_records(self, records: list[dict], conn: sqlite3.Connection = None) -> int:
+        """Insert the records of one or more ticks in a single transaction.
+
+        Args:
+            records: list: Records of the teams (see utils.serialize)
+            conn: sqlite3.Connection: Connection to use, a new one if None
+
+        Returns:
+            int: Number of rows inserted
+        """
+
+        rows = serialize(records)
+        own_conn = conn is None
+        conn = self.connect() if own_conn else conn
+        try:
+            with conn:
+                conn.executemany(f'''
+                    INSERT INTO records ({", ".join(COLUMNS)}, timestamp)
+                    VALUES ({", ".join("?" * (len(COLUMNS) + 1))})
+                ''', rows)
+        finally:
+            if own_conn:
+                conn.close()
+
+        return len(rows)
+
+    def get_records(self, team: str, service: str = None) -> list[dict]:
+        """Get the records of a team, ordered by timestamp.
+
+        Args:
+            team: str: Name of the team
+            service: str: Name of the service, all the services if None
+
+        Returns:
+            list: Records as dictionaries
+        """
+
+        query = f"SELECT {', '.join(COLUMNS)}, timestamp FROM records WHERE name_team = ?"
+        params = [team]
+        if service is not None:
+            query += " AND name_service = ?"
+            params.append(service)
+        query += " ORDER BY timestamp"
+
+        conn = self.connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        return deserialize(COLUMNS, rows)
+
+    # * ------------------ Background writer  ------------------
+
+    def start_writer(self) -> None:
+        """Start the thread that writes the submitted records, so the polling loop never waits for the disk"""
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+        self.writer.start()
+
+    def submit(self, records: list[dict]) -> None:
+        """Queue the records of a tick for the background writer (inserted directly if the writer is not started)
+        Args:
+            records: list: Records of the teams
+        """
+
+        if self.queue is None:
+            self.insert_records(records)
+        else:
+            self.queue.put(records)
+
+    def _write_loop(self) -> None:
+        conn = self.connect()
+        while (records := self.queue.get()) is not None:
+            # Drain what is already queued and write it in one transaction
+            batch = list(records)
+            while not self.queue.empty():
+                pending = self.queue.get_nowait()
+                if pending is None:
+                    self.queue.put(None)
+                    break
+                batch.extend(pending)
+            try:
+                count = self.insert_records(batch, conn=conn)
+                logging.debug("Stored %d rows", count)
+            except Exception as e:
+                # Never let a bad batch stop the writer, the next ones would stay in the queue
+                logging.error(f"Error writing the records: {e!r}")
+        conn.close()
+
+    def close(self) -> None:
+        """Write the queued records and stop the background writer"""
+        if self.writer is not None:
+            self.queue.put(None)
+            self.writer.join()
+            self.writer = None
+            self.queue = None
+
     def remove_db(self, name_table: str) -> None:
         """Remove the database"""
         with sqlite3.connect(self.name_db) as conn:
             c = conn.cursor()
             c.execute(f'''DROP TABLE {name_table}''')
-
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+def minmax(x: list, y: list, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Min/max bucketing: keep the first and last point and the minimum and maximum of every bucket.
+
+    Every spike (SLA drop, burst of flags lost) is kept, because it is the minimum or maximum of its bucket.
+
+    Args:
+        x: list: Values of the x axis
+        y: list: Values of the y axis
+        points: int: Maximum number of points returned
+
+    Returns:
+        tuple: (x, y) downsampled
+    """
+
+    x, y = np.asarray(x), np.asarray(y)
+    if points < 4 or len(y) <= points:
+        return x, y
+
+    buckets = (points - 2) // 2
+    edges = np.linspace(1, len(y) - 1, buckets + 1).astype(int)
+
+    keep = [0]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        segment = y[start:stop]
+        keep += sorted((start + int(np.argmin(segment)), start + int(np.argmax(segment))))
+    keep.append(len(y) - 1)
+
+    keep = np.unique(keep)
+    return x[keep], y[keep]
+
+
+def lttb(x: list, y: list, points: int) -> tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets: for every bucket keep the point that forms the largest triangle with the point
+    kept in the previous bucket and the average of the next one.
+
+    Args:
+        x: list: Values of the x axis
+        y: list: Values of the y axis
+        points: int: Number of points returned
+
+    Returns:
+        tuple: (x, y) downsampled
+    """
+
+    x, y = np.asarray(x), np.asarray(y)
+    if points < 3 or len(y) <= points:
+        return x, y
+
+    x_float, y_float = x.astype(np.float64), y.astype(np.float64)
+    edges = np.linspace(1, len(y) - 1, points - 1).astype(int)
+
+    keep = np.zeros(points, dtype=np.int64)
+    keep[-1] = len(y) - 1
+    selected = 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else len(y)
+        average_x, average_y = x_float[stop:next_stop].mean(), y_float[stop:next_stop].mean()
+
+        area = np.abs((x_float[selected] - average_x) * (y_float[start:stop] - y_float[selected])
+                      - (x_float[selected] - x_float[start:stop]) * (average_y - y_float[selected]))
+        selected = start + int(np.argmax(area))
+        keep[bucket + 1] = selected
+
+    return x[keep], y[keep]
+
+
+METHODS = {"minmax": minmax, "lttb": lttb}
+
+
+def downsample(x: list, y: list, points: int, method: str = "minmax") -> tuple[list, list]:
+    """Reduce a series to at most ``points`` points (unchanged if points is 0 or the series is shorter).
+
+    Args:
+        x: list: Values of the x axis
+        y: list: Values of the y axis
+        points: int: Maximum number of points, 0 to disable
+        method: str: "minmax" or "lttb"
+
+    Returns:
+        tuple: (x, y) downsampled
+    """
+
+    if not points or len(y) <= points:
+        return x, y
+
+    x, y = METHODS[method](x, y, points)
+    return x.tolist(), y.tolist()
@@ -0,0 +1,143 @@
+class ServiceDowntime:
+    """Up/down intervals of a service, run-length encoded: [first round, last round, down] with consecutive intervals
+    of opposite state. The totals of the closed intervals are kept up to date, so every query is O(1).
+    """
+
+    __slots__ = ("intervals", "outages", "down_rounds", "up_periods", "up_rounds", "longest")
+
+    def __init__(self):
+        self.intervals = []
+        self.outages = 0
+        self.down_rounds = 0
+        self.up_periods = 0
+        self.up_rounds = 0
+        self.longest = 0
+
+    def update(self, round: int, down: bool) -> None:
+        """Record the state of the service in a round (rounds not seen take the state of the previous one)
+        Args:
+            round: int: Number of the round
+            down: bool: True if the service is down
+        """
+
+        if self.intervals:
+            last = self.intervals[-1]
+            if round <= last[1]:
+                return
+            if last[2] == down:
+                last[1] = round
+                return
+            last[1] = round - 1
+            self.close(last)
+        self.intervals.append([round, round, down])
+
+    def close(self, interval: list) -> None:
+        """Add a finished interval to the totals"""
+        length = interval[1] - interval[0] + 1
+        if interval[2]:
+            self.outages += 1
+            self.down_rounds += length
+            self.longest = max(self.longest, length)
+        elif self.intervals[0] is not interval:
+            # The first up interval is the start of the competition, not the time between two failures
+            self.up_periods += 1
+            self.up_rounds += length
+
+    def current_outage(self) -> int:
+        """Rounds of the outage in progress, 0 if the service is up"""
+        if not self.intervals or not self.intervals[-1][2]:
+            return 0
+        return self.intervals[-1][1] - self.intervals[-1][0] + 1
+
+    def total_outages(self) -> int:
+        """Number of outages, including the one in progress"""
+        return self.outages + (1 if self.current_outage() else 0)
+
+    def total_down_rounds(self) -> int:
+        return self.down_rounds + self.current_outage()
+
+    def longest_outage(self) -> int:
+        return max(self.longest, self.current_outage())
+
+    def mttr(self) -> float | None:
+        """Mean rounds to repair: average length of the finished outages"""
+        return self.down_rounds / self.outages if self.outages else None
+
+    def mtbf(self) -> float | None:
+        """Mean rounds between failures: average length of the finished up periods after an outage"""
+        return self.up_rounds / self.up_periods if self.up_periods else None
+
+
+class DowntimeTracker:
+    """Outages of every service of every team, from the state of the services in every round checked."""
+
+    def __init__(self):
+        self.teams = {}
+
+    def get(self, team: str, service: str) -> ServiceDowntime:
+        services = self.teams.get(team)
+        if services is None:
+            services = self.teams[team] = {}
+        tracker = services.get(service)
+        if tracker is None:
+            tracker = services[service] = ServiceDowntime()
+        return tracker
+
+    def update(self, team: str, service: str, round: int, down: bool) -> None:
+        """Record the state of a service in a round
+        Args:
+            team: str: Name of the team
+            service: str: Name of the service
+            round: int: Number of the round
+            down: bool: True if the service is down
+        """
+
+        self.get(team, service).update(round, down)
+
+    def reset(self, team: str) -> None:
+        """Forget the intervals of the team"""
+        self.teams.pop(team, None)
+
+    def team(self, team: str) -> dict[str, ServiceDowntime]:
+        """Trackers of the services of the team"""
+        return self.teams.get(team, {})
+
+    def summary(self, team: str) -> dict:
+        """Downtime of the team, all the services together.
+        Args:
+            team: str: Name of the team
+
+        Returns:
+            dict: outages, rounds down, longest outage, MTTR and MTBF (in rounds, None if not known yet) and the
+                services down now with the length of their outage
+        """
+
+        trackers = self.team(team).items()
+        outages = sum(tracker.outages for _, tracker in trackers)
+        up_periods = sum(tracker.up_periods for _, tracker in trackers)
+        return {
+            "outages": sum(tracker.total_outages() for _, tracker in trackers),
+            "down_rounds": sum(tracker.total_down_rounds() for _, tracker in trackers),
+            "longest_outage": max((tracker.longest_outage() for _, tracker in trackers), default=0),
+            "mttr": round(sum(tracker.down_rounds for _, tracker in trackers) / outages, 2) if outages else None,
+            "mtbf": round(sum(tracker.up_rounds for _, tracker in trackers) / up_periods, 2) if up_periods else None,
+            "down_now": {service: tracker.current_outage() for service, tracker in trackers
+                         if tracker.current_outage()},
+        }
+
+    def to_dict(self) -> dict:
+        """Intervals of every service (JSON serializable, for the checkpoint)"""
+        return {team: {service: tracker.intervals for service, tracker in services.items()}
+                for team, services in self.teams.items()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> 'DowntimeTracker':
+        """Rebuild the tracker from the intervals saved by to_dict"""
+        tracker = cls()
+        for team, services in state.items():
+            for service, intervals in services.items():
+                service_tracker = tracker.get(team, service)
+                for first, last, down in intervals:
+                    service_tracker.update(first, down)
+                    service_tracker.update(last, down)
+        return tracker
@@ -0,0 +1,212 @@
+import numpy as np
+
+# Percentiles of the score of the field drawn as bands in the report
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class FieldAnalytics:
+    """Score and position of every team of the competition, from a single global chart, with the statistics of the
+    whole field computed for all the teams and rounds at once. The next rounds are appended from the global table of
+    the round, computing only their statistics.
+
+    Every array has shape teams x rounds, with the rows in the order of ``teams``. They are views of buffers with
+    room for more rounds, so appending a round does not copy the previous ones.
+
+    Args:
+        teams: list: Name of the teams
+        score: np.ndarray: Total score of every team in every round
+        position: np.ndarray: Position of every team in every round, computed from the score if None
+        window: int: Rounds used for the rank volatility
+    """
+
+    def __init__(self, teams: list[str], score: np.ndarray, position: np.ndarray = None, window: int = 10):
+        self.teams = list(teams)
+        self.index = {team: row for row, team in enumerate(self.teams)}
+        self.window = window
+
+        self.rounds = 0
+        self.buffers = {}
+        self.extend(np.asarray(score, dtype=np.int64).reshape(len(self.teams), -1), position)
+
+    @classmethod
+    def from_global_chart(cls, chart: dict, window: int = 10) -> 'FieldAnalytics':
+        """Build the analytics from the global chart of a round.
+        Args:
+            chart: dict: Global chart ({"teams": [{"shortname", "score": [...], "position": [...] (optional)}]})
+            window: int: Rounds used for the rank volatility
+
+        Returns:
+            FieldAnalytics: Analytics of the field
+        """
+
+        entries = chart['teams']
+        rounds = min(len(entry['score']) for entry in entries)
+        score = np.array([entry['score'][:rounds] for entry in entries], dtype=np.int64)
+        position = None
+        if all('position' in entry for entry in entries):
+            position = np.array([entry['position'][:rounds] for entry in entries], dtype=np.int64)
+        return cls([entry['shortname'] for entry in entries], score, position, window=window)
+
+    def append_table(self, table: dict) -> None:
+        """Append the round of a global table ({"teams": [{"shortname", "score", "position" (optional)}]}). The teams
+        missing from the table keep the score of the previous round, the teams not in the chart are ignored.
+
+        Args:
+            table: dict: Global table of the next round
+        """
+
+        entries = {entry['shortname']: entry for entry in table['teams'] if entry['shortname'] in self.index}
+        previous = self.score[:, -1] if self.rounds else np.zeros(len(self.teams), dtype=np.int64)
+        score = np.array([entries[team]['score'] if team in entries else previous[row]
+                          for row, team in enumerate(self.teams)], dtype=np.int64)
+        position = None
+        if len(entries) == len(self.teams) and all('position' in entry for entry in entries.values()):
+            position = np.array([entries[team]['position'] for team in self.teams], dtype=np.int64)
+        self.extend(score[:, None], None if position is None else position[:, None])
+
+    def extend(self, score: np.ndarray, position: np.ndarray = None) -> None:
+        """Append rounds and compute their statistics.
+        Args:
+            score: np.ndarray: Total score of every team in the new rounds (teams x new rounds)
+            position: np.ndarray: Position of every team in the new rounds, computed from the score if None
+        """
+
+        start, end = self.rounds, self.rounds + score.shape[1]
+        self.reserve(end)
+        self.buffers['score'][:, start:end] = score
+        if position is None:
+            # Position 1 for the best score of every round, ties broken by the order of the teams
+            order = np.argsort(-score, axis=0, kind="stable")
+            position = np.empty_like(order)
+            np.put_along_axis(position, order, np.arange(1, len(self.teams) + 1)[:, None], axis=0)
+        self.buffers['position'][:, start:end] = position
+
+        self.rounds = end
+        self.views()
+        self.compute(start)
+
+    def reserve(self, rounds: int) -> None:
+        """Grow the buffers (doubling them) to hold at least ``rounds`` rounds"""
+
+        capacity = self.buffers['score'].shape[1] if self.buffers else 0
+        if rounds <= capacity:
+            return
+        capacity = max(rounds, 2 * capacity)
+        teams = len(self.teams)
+        shapes = {"score": (teams, np.int64), "position": (teams, np.int64), "delta": (teams, np.int64),
+                  "gap_above": (teams, np.int64), "gap_below": (teams, np.int64),
+                  "volatility": (teams, np.float64), "percentile": (teams, np.float64),
+                  "bands": (len(PERCENTILES), np.float64)}
+        for name, (rows, dtype) in shapes.items():
+            buffer = np.zeros((rows, capacity), dtype=dtype)
+            if name in self.buffers:
+                buffer[:, :self.rounds] = self.buffers[name][:, :self.rounds]
+            self.buffers[name] = buffer
+
+    def views(self) -> None:
+        """Point the arrays of the statistics to the rounds filled in the buffers"""
+        for name, buffer in self.buffers.items():
+            setattr(self, name, buffer[:, :self.rounds])
+
+    def compute(self, start: int = 0) -> None:
+        """Compute the statistics of every team in the rounds from ``start``
+        Args:
+            start: int: First round to compute (the previous ones are already computed)
+        """
+
+        teams, rounds = self.score.shape
+        score = self.score[:, start:]
+        position = self.position[:, start:]
+
+        # Score change from the previous round
+        previous = self.score[:, start - 1:rounds - 1] if start else np.concatenate(
+            [self.score[:, :1], self.score[:, :rounds - 1]], axis=1)
+        self.delta[:, start:] = score - previous
+
+        # Gap to the team right above and right below in the leaderboard (0 for the first and the last)
+        order = np.argsort(position, axis=0, kind="stable")
+        ranked = np.take_along_axis(score, order, axis=0)
+        above = np.zeros_like(ranked)
+        below = np.zeros_like(ranked)
+        above[1:] = ranked[:-1] - ranked[1:]
+        below[:-1] = ranked[:-1] - ranked[1:]
+        gap_above = np.empty_like(above)
+        gap_below = np.empty_like(below)
+        np.put_along_axis(gap_above, order, above, axis=0)
+        np.put_along_axis(gap_below, order, below, axis=0)
+        self.gap_above[:, start:] = gap_above
+        self.gap_below[:, start:] = gap_below
+
+        # Rank volatility: standard deviation of the position changes in the last ``window`` rounds, from the changes
+        # of the rounds in the window of the first round computed
+        first = max(start - self.window + 1, 0)
+        history = self.position[:, first:]
+        changes = np.diff(history, axis=1, prepend=self.position[:, first - 1:first] if first else history[:, :1])
+        changes = changes.astype(np.float64)
+        sums = np.cumsum(np.pad(changes, ((0, 0), (1, 0))), axis=1)
+        squares = np.cumsum(np.pad(changes ** 2, ((0, 0), (1, 0))), axis=1)
+        end = np.arange(start + 1, rounds + 1)
+        begin = np.maximum(end - self.window, 0)
+        count = end - begin
+        mean = (sums[:, end - first] - sums[:, begin - first]) / count
+        variance = (squares[:, end - first] - squares[:, begin - first]) / count - mean ** 2
+        self.volatility[:, start:] = np.sqrt(np.maximum(variance, 0))
+
+        # Score of the field at every percentile (percentiles x rounds) and percentile of every team
+        if teams:
+            self.bands[:, start:] = np.percentile(score, PERCENTILES, axis=0)
+        self.percentile[:, start:] = (teams - position) / max(teams - 1, 1) * 100
+
+    def __len__(self):
+        return self.score.shape[1]
+
+    def __contains__(self, team: str) -> bool:
+        return team in self.index
+
+    def trajectory(self, team: str) -> np.ndarray:
+        """Position of the team in every round"""
+        return self.position[self.index[team]]
+
+    def bands_with(self, team: str, rounds: list[int]) -> dict[str, list]:
+        """Score of the team and of the percentile bands of the field, for a plot of the report.
+        Args:
+            team: str: Name of the team
+            rounds: list: Rounds to use
+
+        Returns:
+            dict: Line name -> values
+        """
+
+        lines = {team: self.score[self.index[team], rounds].tolist()}
+        for percentile, band in zip(PERCENTILES, self.bands):
+            lines[f"p{percentile}"] = band[rounds].tolist()
+        return lines
+
+    def summary(self, team: str, round: int = -1) -> dict:
+        """Statistics of the team in a round (the last one by default).
+        Args:
+            team: str: Name of the team
+            round: int: Round
+
+        Returns:
+            dict: position, change of position, score, score delta, gaps, volatility and percentile
+        """
+
+        row = self.index[team]
+        previous = round - 1 if round != 0 and len(self) > 1 else round
+        return {
+            "position": int(self.position[row, round]),
+            "position_change": int(self.position[row, previous] - self.position[row, round]),
+            "score": int(self.score[row, round]),
+            "delta": int(self.delta[row, round]),
+            "gap_above": int(self.gap_above[row, round]),
+            "gap_below": int(self.gap_below[row, round]),
+            "volatility": round_float(self.volatility[row, round]),
+            "percentile": round_float(self.percentile[row, round]),
+            "best_position": int(self.position[row].min()),
+            "worst_position": int(self.position[row].max()),
+        }
+
+
+def round_float(value: float) -> float:
+    return round(float(value), 2)
@@ -0,0 +1,137 @@
+import sys
+from collections import deque
+
+UP = 101
+
+
+class ServiceRecord:
+    """Status of a service in a round: the fields of the team table kept by the monitor, with interned strings.
+
+    Args:
+        service: str: Name of the service
+        exit_code: int: First failing exitCode of the checks, 101 if all the checks are up
+        stdout: str: Output of the check with that exit code
+        action: str: Action of the check with that exit code
+        stolen: int: Flags stolen (cumulative)
+        lost: int: Flags lost (cumulative)
+        score: int: Score of the service
+        sla: float: SLA of the service reported by the scoreboard
+    """
+
+    __slots__ = ("service", "exit_code", "stdout", "action", "stolen", "lost", "score", "sla")
+
+    def __init__(self, service: str, exit_code: int, stdout: str, action: str, stolen: int = 0, lost: int = 0,
+                 score: int = 0, sla: float = None):
+        self.service = service
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.action = action
+        self.stolen = stolen
+        self.lost = lost
+        self.score = score
+        self.sla = sla
+
+    @property
+    def is_up(self) -> bool:
+        return self.exit_code == UP
+
+    def __repr__(self):
+        return f"ServiceRecord({self.service!r}, {self.exit_code}, {self.stdout!r}, {self.action!r})"
+
+
+class RoundRecord:
+    """Status of all the services of a team in a round.
+
+    Args:
+        round: int: Number of the round
+        position: int: Position of the team
+        timestamp: str: When the round was checked
+        services: tuple: ServiceRecord of every service
+    """
+
+    __slots__ = ("round", "position", "timestamp", "services")
+
+    def __init__(self, round: int, position: int, timestamp: str, services: tuple[ServiceRecord, ...]):
+        self.round = round
+        self.position = position
+        self.timestamp = timestamp
+        self.services = services
+
+    def down(self) -> list[str]:
+        """Services down in the round"""
+        return [record.service for record in self.services if not record.is_up]
+
+    def __repr__(self):
+        return f"RoundRecord({self.round}, down={self.down()})"
+
+
+def intern(value) -> str:
+    """Intern a string of the scoreboard (the same names and outputs repeat in every round)"""
+    if value is None:
+        return ""
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+
+class History:
+    """Last ``max_rounds`` rounds checked for every team, as compact records in a ring buffer, so the memory used by
+    the monitor does not grow with the duration of the competition. The incremental report reads the new rounds from
+    here instead of downloading them again.
+
+    Args:
+        max_rounds: int: Rounds kept for every team
+    """
+
+    def __init__(self, max_rounds: int = 120):
+        self.max_rounds = max_rounds
+        self.teams = {}
+
+    def add(self, team: str, round: int, round_data: dict, timestamp: str) -> RoundRecord:
+        """Store a round of the team table.
+        Args:
+            team: str: Name of the team
+            round: int: Number of the round
+            round_data: dict: Round of the team table
+            timestamp: str: When the round was checked
+
+        Returns:
+            RoundRecord: The stored record
+        """
+
+        services = []
+        for service in round_data['services']:
+            failing = next((check for check in service.get('checks', []) if check['exitCode'] != UP), None)
+            check = failing or (service['checks'][0] if service.get('checks') else {})
+            services.append(ServiceRecord(
+                intern(service['shortname']),
+                failing['exitCode'] if failing else UP,
+                intern(check.get('stdout')),
+                intern(check.get('action')),
+                service.get('stolen', 0),
+                service.get('lost', 0),
+                service.get('score', 0),
+                service.get('sla'),
+            ))
+
+        record = RoundRecord(round, round_data.get('position', 0), timestamp, tuple(services))
+        rounds = self.teams.get(team)
+        if rounds is None:
+            rounds = self.teams[team] = deque(maxlen=self.max_rounds)
+        rounds.append(record)
+        return record
+
+    def rounds(self, team: str) -> list[RoundRecord]:
+        """Rounds of the team still in the buffer, oldest first"""
+        return list(self.teams.get(team, ()))
+
+    def last(self, team: str) -> RoundRecord | None:
+        """Last round checked for the team"""
+        rounds = self.teams.get(team)
+        return rounds[-1] if rounds else None
+
+    def service(self, team: str, service: str) -> list[ServiceRecord]:
+        """Status of a service in the rounds still in the buffer, oldest first"""
+        return [record for round_record in self.teams.get(team, ()) for record in round_record.services
+                if record.service == service]
+
+    def __len__(self):
+        return sum(len(rounds) for rounds in self.teams.values())
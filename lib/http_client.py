@@ -0,0 +1,144 @@
+import hashlib
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from lib.metrics import metrics
+
+
+class APIError(Exception):
+    """Raised when the scoreboard API can not be reached or answers with an error."""
+
+    def __init__(self, url: str, status_code: int | None = None, message: str = ""):
+        self.url = url
+        self.status_code = status_code
+        super().__init__(f"{url} | status: {status_code} | Error: {message}")
+
+
+def endpoint_labels(path: str) -> dict:
+    """Labels of the metrics of a request: endpoint without the variable part and team (empty for the global ones)
+    Args:
+        path: str: Path of the request, e.g. /api/scoreboard/team/table/unisa
+
+    Returns:
+        dict: {"endpoint": "team/table", "team": "unisa"}
+    """
+
+    endpoint, _, key = path.removeprefix("/api/scoreboard/").rpartition("/")
+    return {"endpoint": endpoint, "team": key if endpoint.startswith("team/") else ""}
+
+
+class HTTPClient:
+    """Shared session with keep-alive pooling, gzip and retries with exponential backoff and jitter.
+
+    Args:
+        address: str: Address of the scoreboard (host[:port], the scheme is optional)
+        timeout: float: Timeout of a single request in seconds
+        retries: int: Number of retries for connection errors and 5xx responses
+        backoff: float: Base of the exponential backoff in seconds
+        pool_size: int: Number of connections kept alive
+    """
+
+    def __init__(self, address: str, timeout: float = 10, retries: int = 3, backoff: float = 0.5,
+                 pool_size: int = 16):
+        self.base_url = address if "://" in address else f"http://{address}"
+        self.base_url = self.base_url.rstrip("/")
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            backoff_jitter=backoff,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # path -> (ETag, Last-Modified, digest of the body) of the last conditional response
+        self.validators = {}
+
+    def get(self, path: str, conditional: bool = False, stream: bool = False) -> requests.Response | None:
+        """GET a path of the scoreboard.
+
+        Args:
+            path: str: Path of the endpoint
+            conditional: bool: Send If-None-Match/If-Modified-Since from the previous response of the same path
+            stream: bool: Do not download the body, read it from response.raw (not with conditional)
+
+        Returns:
+            requests.Response: Response of the server, None if conditional and the document is not modified
+
+        Raises:
+            APIError: If the server is unreachable or the status is not 200
+        """
+
+        url = f"{self.base_url}{path}"
+        headers = {}
+        if conditional and path in self.validators:
+            etag, last_modified, _ = self.validators[path]
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        labels = endpoint_labels(path)
+        try:
+            with metrics.timer("request", **labels):
+                response = self.session.get(url, timeout=self.timeout, headers=headers, stream=stream)
+        except requests.RequestException as e:
+            metrics.inc("request_errors", **labels)
+            raise APIError(url, message=str(e)) from e
+
+        if response.raw.retries is not None and response.raw.retries.history:
+            metrics.inc("retries", len(response.raw.retries.history), **labels)
+
+        if conditional and response.status_code == 304:
+            logging.debug("%s not modified", path)
+            return None
+
+        if response.status_code != 200:
+            raise APIError(url, response.status_code, response.text)
+
+        if conditional:
+            # Servers without validators still send the same bytes when nothing changed
+            digest = hashlib.blake2b(response.content, digest_size=16).digest()
+            if path in self.validators and self.validators[path][2] == digest:
+                logging.debug("%s has the same content of the previous response", path)
+                return None
+            self.validators[path] = (response.headers.get("ETag"), response.headers.get("Last-Modified"), digest)
+
+        return response
+
+    def get_json(self, path: str, conditional: bool = False) -> dict | None:
+        """GET a path of the scoreboard and decode the JSON body.
+
+        Args:
+            path: str: Path of the endpoint
+            conditional: bool: Return None without decoding if the document is not modified
+
+        Returns:
+            dict: Decoded body, None if conditional and the document is not modified
+        """
+
+        response = self.get(path, conditional=conditional)
+        if response is None:
+            return None
+
+        try:
+            with metrics.timer("decode", **endpoint_labels(path)):
+                return response.json()
+        except ValueError as e:
+            raise APIError(response.url, response.status_code, f"Invalid JSON: {e}") from e
+
+    def close(self) -> None:
+        """Close the pooled connections"""
+        logging.debug("Closing the HTTP session")
+        self.session.close()
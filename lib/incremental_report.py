@@ -0,0 +1,202 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from lib.API import API
+from lib.downtime import DowntimeTracker
+from lib.field_analytics import FieldAnalytics
+from lib.history import History, RoundRecord
+from lib.logger import logging
+from lib.round_matrix import RoundMatrix
+from lib.statistic_manager import StatisticManager
+
+
+class IncrementalReport:
+    """Report built during the competition: every update appends the rounds finished since the previous update to
+    the RoundMatrix of every team and updates the running aggregates of the report. The rounds are taken from the
+    History of the monitor, only the rounds missing from it are downloaded. The plots are rendered in the background
+    after every update, so at the end only the last rounds are left.
+
+    Args:
+        teams: list: Name of the teams
+        services: list: Name of the services
+        downtime_count: dict: Downtime of the teams (shared with the monitor)
+        api: API: API used to download the missing rounds
+        downtime: DowntimeTracker: Outages of the services (shared with the monitor)
+        history: History: Rounds checked by the monitor (shared with the monitor), None to download every round
+    """
+
+    def __init__(self, teams: list[str], services: list[str], downtime_count: dict, api: API,
+                 downtime: DowntimeTracker = None, history: History = None):
+        self.teams = list(teams)
+        self.services = services
+        self.api = api
+        self.history = history
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report")
+        self.rendering: Future | None = None
+        self.rendered_rounds = 0
+
+        self.matrices = {team: RoundMatrix(services) for team in teams}
+        self.up_count = {team: np.zeros(len(services), dtype=np.int64) for team in teams}
+        self.statistic = StatisticManager(teams_name=teams, downtime_count=downtime_count, services=services,
+                                          matrices=self.matrices, downtime=downtime)
+
+    def add_team(self, team: str) -> None:
+        """Add a team found during the competition (watch_all mode), its rounds are downloaded at the next update
+        Args:
+            team: str: Name of the team
+        """
+
+        if team in self.matrices:
+            return
+        self.teams.append(team)
+        self.matrices[team] = RoundMatrix(self.services)
+        self.up_count[team] = np.zeros(len(self.services), dtype=np.int64)
+        self.statistic.add_team(team)
+
+    def update(self, field: FieldAnalytics = None) -> None:
+        """Append the new rounds of every team, rewrite the partial report and start rendering the plots
+        Args:
+            field: FieldAnalytics: Analytics of the field kept by the monitor, None to download the global chart
+        """
+
+        start = time.perf_counter()
+        for team in self.teams:
+            try:
+                self.update_team(team)
+            except Exception as e:
+                logging.error(f"Error updating the report of {team}: {e}")
+
+        self.statistic.rounds = list(range(min((len(matrix) for matrix in self.matrices.values()), default=0)))
+        self.statistic.generate_snapshot()
+        logging.info(f"Report updated to round {len(self.statistic.rounds) - 1} in {time.perf_counter() - start:.2f}s")
+
+        if self.rendering is None or self.rendering.done():
+            self.render(field)
+
+    def render(self, field: FieldAnalytics = None) -> None:
+        """Compute the plots of the rounds collected so far and render them on the report thread
+        Args:
+            field: FieldAnalytics: Analytics of the field kept by the monitor, None to download the global chart
+        """
+
+        statistic = self.statistic
+        if not statistic.rounds or len(statistic.rounds) == self.rendered_rounds:
+            return
+
+        if field is not None and len(field) >= len(statistic.rounds):
+            statistic.field, statistic.field_loaded = field, True
+        elif statistic.field is not None and len(statistic.field) < len(statistic.rounds):
+            # Downloaded for fewer rounds, downloaded again
+            statistic.field_loaded = False
+
+        statistic.queue_plots()
+        jobs, statistic.plot_jobs = statistic.plot_jobs, []
+        self.rendered_rounds = len(statistic.rounds)
+        self.rendering = self.executor.submit(statistic.render_queued, jobs)
+
+    def wait_rendering(self) -> None:
+        """Wait for the plots being rendered"""
+
+        if self.rendering is None:
+            return
+        try:
+            self.rendering.result()
+        except Exception as e:
+            logging.error(f"Error rendering the plots: {e}")
+            self.rendered_rounds = 0
+
+    def update_team(self, team: str) -> None:
+        """Append the rounds of the team after the last one appended and update the aggregates. The rounds still in
+        the History are used as they are, the ones before them are decoded from the table and the chart
+        Args:
+            team: str: Name of the team
+        """
+
+        matrix = self.matrices[team]
+        first_round = len(matrix)
+
+        records = consecutive(self.history.rounds(team), first_round) if self.history is not None else []
+        first_recorded = records[0].round if records else None
+        if first_recorded == first_round:
+            new = RoundMatrix.from_records(self.services, records)
+        else:
+            # Rounds not in the History (before the report started, skipped ticks or out of the buffer)
+            table = self.api.get_team_table(team, rounds=slice(first_round, first_recorded))
+            new = RoundMatrix(self.services, table=table, chart=self.api.get_team_chart(team), first_round=first_round)
+            if records and first_round + len(new) == first_recorded:
+                new.extend(RoundMatrix.from_records(self.services, records))
+        if not len(new):
+            return
+
+        statistic = self.statistic
+        team_score = new.team_score()
+        sla = new.sla(initial_up=self.up_count[team])
+
+        statistic.max_score[team] = running(max, statistic.max_score[team], team_score.max().item())
+        statistic.min_score[team] = running(min, statistic.min_score[team], team_score.min().item())
+        statistic.max_rank[team] = running(max, statistic.max_rank[team], new.position.max().item())
+        statistic.min_rank[team] = running(min, statistic.min_rank[team], new.position.min().item())
+
+        for column, service in enumerate(self.services):
+            statistic.max_score_service[team][service] = running(max, statistic.max_score_service[team].get(service),
+                                                                 new.score[:, column].max().item())
+            statistic.min_score_service[team][service] = running(min, statistic.min_score_service[team].get(service),
+                                                                 new.score[:, column].min().item())
+            statistic.min_sla[team][service] = running(min, statistic.min_sla[team].get(service),
+                                                       sla[:, column].min().item())
+            # Flags are cumulative: the total is the value of the last round
+            statistic.total_flags_submitted[team][service] = new.stolen[-1, column].item()
+            statistic.total_flags_lost[team][service] = new.lost[-1, column].item()
+
+        self.up_count[team] += new.up.sum(axis=0)
+        matrix.extend(new)
+
+    def finalize(self, field: FieldAnalytics = None) -> StatisticManager:
+        """Append the last rounds and render their plots, then return the StatisticManager, ready to generate the
+        report without downloading the history.
+        Args:
+            field: FieldAnalytics: Analytics of the field kept by the monitor, None to download the global chart
+
+        Returns:
+            StatisticManager: Statistic of the competition
+        """
+
+        self.wait_rendering()
+        self.update(field)
+        self.wait_rendering()
+        self.executor.shutdown()
+        return self.statistic
+
+
+def consecutive(records: list[RoundRecord], first_round: int) -> list[RoundRecord]:
+    """Records from first_round onwards, without the ones before the last missing round
+    Args:
+        records: list: RoundRecord of the team, oldest first
+        first_round: int: First round needed
+
+    Returns:
+        list: RoundRecord of consecutive rounds, oldest first
+    """
+
+    start = len(records)
+    while start > 0 and records[start - 1].round >= first_round and (
+            start == len(records) or records[start - 1].round == records[start].round - 1):
+        start -= 1
+    return records[start:]
+
+
+def running(aggregate, previous, value):
+    """Combine the aggregate of the previous rounds (None or {} if there are none yet) with the one of the new rounds
+    Args:
+        aggregate: Callable: max or min
+        previous: Any: Aggregate of the previous rounds
+        value: Any: Aggregate of the new rounds
+
+    Returns:
+        Any: Aggregate of all the rounds
+    """
+
+    return value if previous is None or previous == {} else aggregate(previous, value)
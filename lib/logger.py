@@ -1,10 +1,12 @@
 """Class for print the log."""
+import atexit
+import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from colorama import Fore, Style, init
 
-from lib.utils import get_config
-
 
 # ---- This file makes the preset for Log ----
 
@@ -37,18 +39,90 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: black + date + bold_red + level_name + white + message + green + filename,
     }
 
+    def __init__(self):
+        super().__init__()
+        # One formatter per level, built once (the format string is parsed only here)
+        self.formatters = {level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()}
+        self.default = logging.Formatter(self.FORMATS[logging.INFO])
+
     def format(self, record):
         """Format the message with custom colors and styles.
 
         Args:
-            record (_type_): _description_
+            record (logging.LogRecord): The record to format
 
         Returns:
             str: The log formatted
         """
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+        return self.formatters.get(record.levelno, self.default).format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (time, level, message, file, line), for ingestion by other tools"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def set_level(logging_level: str) -> None:
+    """Set the logging level (read from config.json by the caller, the import of this module does not read it).
+
+    Args:
+        logging_level (str): One of Debug, Info, Warning, Error, Critical
+    """
+    level_num = logging.getLevelName(logging_level.upper())
+    logging.getLogger().setLevel(level_num)
+
+
+def set_output(log_queue: bool = False, json_file: str = None) -> None:
+    """Configure where the log is written (read from config.json by the caller).
+
+    Args:
+        log_queue (bool): Write the log from a background thread (QueueHandler/QueueListener), the callers only queue
+            the records
+        json_file (str): Also write the log as JSON lines to this file
+    """
+    global listener
+
+    root = logging.getLogger()
+    stop_listener()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+
+    handlers = [handler]
+    if json_file:
+        json_handler = logging.FileHandler(json_file)
+        json_handler.setFormatter(JsonFormatter())
+        handlers.append(json_handler)
+
+    if not log_queue:
+        for output in handlers:
+            root.addHandler(output)
+        return
+
+    records = queue.SimpleQueue()
+    root.addHandler(QueueHandler(records))
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    listener.start()
+
+
+def stop_listener() -> None:
+    """Write the queued records and stop the background thread of the log"""
+    global listener
+
+    if listener is not None:
+        listener.stop()
+        listener = None
 
 
 # Initialize colorama
@@ -58,12 +132,13 @@ init(autoreset=True)
 for handler in logging.root.handlers[:]:
     logging.root.removeHandler(handler)
 
-logging_level, _, _, _ = get_config()
-
 # Set the logging level
-level_num = logging.getLevelName(logging_level)
-logging.getLogger().setLevel(level_num)
+logging.getLogger().setLevel(logging.INFO)
 
 handler = logging.StreamHandler()
 handler.setFormatter(CustomFormatter())
 logging.getLogger().addHandler(handler)
+
+# Background thread that writes the queued records (see set_output)
+listener = None
+atexit.register(stop_listener)
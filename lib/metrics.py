@@ -0,0 +1,181 @@
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.logger import logging
+
+PREFIX = "slanotifier_"
+
+# Upper bounds (seconds) of the buckets of the histograms
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+NULL_TIMER = nullcontext()
+
+
+def escape(value) -> str:
+    """Escape a label value for the text format"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Timer:
+    """Context manager that adds its duration to a histogram"""
+
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "Metrics", name: str, labels: dict):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """Counters and latency histograms with labels, exported in the Prometheus text format.
+
+    Disabled by default: every method returns immediately, so the instrumented code costs one call and one check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.counters = {}
+        # (name, labels) -> [count of every bucket, sum, count]
+        self.histograms = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    @staticmethod
+    def key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increment a counter
+        Args:
+            name: str: Name of the counter (without prefix and _total)
+            value: float: Increment
+            **labels: str: Labels of the counter
+        """
+
+        if not self.enabled:
+            return
+        key = self.key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Add a duration to a histogram
+        Args:
+            name: str: Name of the histogram (without prefix and _seconds)
+            seconds: float: Duration
+            **labels: str: Labels of the histogram
+        """
+
+        if not self.enabled:
+            return
+        key = self.key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def timer(self, name: str, **labels) -> Timer | nullcontext:
+        """Context manager that measures the duration of the block into a histogram
+        Args:
+            name: str: Name of the histogram
+            **labels: str: Labels of the histogram
+
+        Returns:
+            Timer: The timer (a shared no-op context if the metrics are disabled)
+        """
+
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name, labels)
+
+    @staticmethod
+    def format_labels(labels: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{escape(value)}"' for name, value in labels]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text format
+        Returns:
+            str: Text of the /metrics endpoint
+        """
+
+        lines = []
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: (list(value[0]), value[1], value[2]) for key, value in self.histograms.items()}
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {PREFIX}{name}_total counter")
+            for (metric, labels), value in counters.items():
+                if metric == name:
+                    lines.append(f"{PREFIX}{name}_total{self.format_labels(labels)} {value}")
+
+        for name in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {PREFIX}{name}_seconds histogram")
+            for (metric, labels), (buckets, total, count) in histograms.items():
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip((*BUCKETS, "+Inf"), buckets):
+                    cumulative += bucket
+                    bucket_labels = self.format_labels(labels, 'le="' + str(bound) + '"')
+                    lines.append(f"{PREFIX}{name}_seconds_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{PREFIX}{name}_seconds_sum{self.format_labels(labels)} {total}")
+                lines.append(f"{PREFIX}{name}_seconds_count{self.format_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics request: {format % args}")
+
+
+def start_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Enable the metrics and serve them on http://host:port/metrics from a background thread
+    Args:
+        port: int: Port of the endpoint
+        host: str: Address of the endpoint (local only by default)
+
+    Returns:
+        ThreadingHTTPServer: The server (server.shutdown() for stop it)
+    """
+
+    metrics.enable()
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logging.info(f"Metrics on http://{host}:{port}/metrics")
+    return server
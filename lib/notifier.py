@@ -0,0 +1,163 @@
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from lib.logger import logging
+from lib.metrics import metrics
+
+
+class DesktopSink:
+    """Desktop notification (plyer)"""
+
+    def send(self, alert: dict) -> None:
+        from plyer import notification
+
+        notification.notify(title='Alert', message=alert['message'], timeout=10)
+
+
+class WebhookSink:
+    """POST of the alert as JSON to a webhook (e.g. a chat bot)
+
+    Args:
+        url: str: URL of the webhook
+        timeout: float: Timeout of the request in seconds
+    """
+
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, alert: dict) -> None:
+        response = self.session.post(self.url, json=alert, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class FileSink:
+    """Append the alert as a JSON line to a file
+
+    Args:
+        path: str: Path of the file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, alert: dict) -> None:
+        with open(self.path, "a") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class NotificationDispatcher:
+    """Collect the services down during a tick and send one summary per team from a background thread, so a slow sink
+    never delays the polling.
+
+    A team is notified at most once every ``rate_limit`` seconds, the services down in the meantime are kept and sent
+    together with the next summary if they are still down.
+
+    Args:
+        sinks: list: Sinks of the alerts (objects with a send(alert) method)
+        rate_limit: float: Minimum seconds between two summaries of the same team
+    """
+
+    def __init__(self, sinks: list, rate_limit: float = 0):
+        self.sinks = sinks
+        self.rate_limit = rate_limit
+
+        self.pending = {}
+        self.last_sent = {}
+        self.sent = 0
+
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self._send_loop, name="notifier", daemon=True)
+        self.worker.start()
+
+    def submit(self, team: str, service: str) -> None:
+        """Record a service down, sent with the summary of the team at the next flush
+        Args:
+            team: str: Name of the team
+            service: str: Name of the service
+        """
+
+        self.pending.setdefault(team, {})[service] = None
+
+    def discard_recovered(self, team: str, services_down: list[str]) -> None:
+        """Forget the pending services of the team that are up again, so a delayed summary is never stale
+        Args:
+            team: str: Name of the team
+            services_down: list: Services of the team down in the last round
+        """
+
+        pending = self.pending.get(team)
+        if not pending:
+            return
+        for service in [service for service in pending if service not in services_down]:
+            del pending[service]
+        if not pending:
+            del self.pending[team]
+            logging.debug("Delayed notification for %s dropped, the services are up again", team)
+
+    def flush(self) -> None:
+        """Queue one summary for every team with services down (teams still rate limited are kept for later)"""
+
+        now = time.monotonic()
+        for team in list(self.pending):
+            if team in self.last_sent and now - self.last_sent[team] < self.rate_limit:
+                logging.debug("Notification for %s delayed by the rate limit", team)
+                continue
+
+            services = list(self.pending.pop(team))
+            self.last_sent[team] = now
+            self.queue.put({
+                "team": team,
+                "services": services,
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "message": f"The services: {', '.join(services)} are down for target {team} "
+                           f"| {datetime.now().strftime('%H:%M:%S')}",
+            })
+
+    def _send_loop(self) -> None:
+        while (alert := self.queue.get()) is not None:
+            for sink in self.sinks:
+                try:
+                    with metrics.timer("notify", sink=type(sink).__name__):
+                        sink.send(alert)
+                except Exception as e:
+                    metrics.inc("notify_errors", sink=type(sink).__name__)
+                    logging.error(f"Error sending the notification with {type(sink).__name__}: {e}")
+            self.sent += 1
+            logging.info(f"Notification sent for services {alert['services']} in team {alert['team']}.")
+
+    def close(self) -> None:
+        """Send the queued summaries and stop the background thread"""
+        if self.worker is not None:
+            self.queue.put(None)
+            self.worker.join()
+            self.worker = None
+
+
+def create_dispatcher(config: dict) -> NotificationDispatcher:
+    """Build the dispatcher from the "notify" option of config.json.
+    Args:
+        config: dict: {"sinks": ["desktop", "webhook", "file"], "webhook": url, "file": path, "rate_limit": seconds}
+
+    Returns:
+        NotificationDispatcher: Dispatcher with the configured sinks
+    """
+
+    sinks = []
+    for name in config.get("sinks", ["desktop"]):
+        if name == "desktop":
+            sinks.append(DesktopSink())
+        elif name == "webhook":
+            sinks.append(WebhookSink(config["webhook"]))
+        elif name == "file":
+            sinks.append(FileSink(config.get("file", "notifications.jsonl")))
+        else:
+            logging.error(f"Unknown notification sink: {name}")
+
+    return NotificationDispatcher(sinks, rate_limit=config.get("rate_limit", 0))
@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import mpld3
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from mpld3 import plugins
+
+from lib.downsample import downsample
+
+try:
+    # Internals of mpld3 (pinned in requirements.txt), they also return the CSS and the Javascript of the plugins
+    from mpld3.mpld3renderer import MPLD3Renderer
+    from mpld3.mplexporter import Exporter
+except ImportError:
+    Exporter = MPLD3Renderer = None
+
+matplotlib.use("Agg")
+# With the DEBUG level of the tool matplotlib logs every font lookup while rendering
+logging.getLogger("matplotlib").setLevel(logging.WARNING)
+
+
+# ---- Rendering of the plots, with only the object-oriented API so that every process owns its figures ----
+
+def format_label(fig: Figure, ax, title: str) -> None:
+    """Format the label of the plot.
+
+    Args:
+        fig: Figure: Figure of the plot
+        ax: Axes: Axes of the plot
+        title: str: Title of the plot
+    """
+
+    ax.set_xlabel('Round')
+    ax.set_ylabel('Score')
+    ax.set_title(title)
+    ax.grid(True)
+    ax.legend()
+
+    fig.autofmt_xdate()
+
+
+def new_figure() -> tuple[Figure, object]:
+    """Create a figure attached to an Agg canvas.
+
+    Returns:
+        tuple: (Figure, Axes)
+    """
+
+    fig = Figure(figsize=(20, 10))
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def create_plot_service_data(rounds: list, service_data: dict, services: list, title: str, max_points: int = 0,
+                             method: str = "minmax") -> Figure:
+    """Create the plot based on the single services
+    Args:
+        rounds: list: Rounds (x axis)
+        service_data: dict: Service data
+        services: list: Services to plot
+        title: str: Title of the plot
+        max_points: int: Maximum number of points for every service, 0 for all the rounds
+        method: str: Downsampling method ("minmax" or "lttb")
+
+    Returns:
+        Figure: Figure of the plot created
+    """
+
+    fig, ax = new_figure()
+
+    lines = []
+    labels = []
+    for service in services:
+        line, = ax.plot(*downsample(rounds, service_data[service], max_points, method), label=service, alpha=0.6)
+        lines.append(line)
+        labels.append(service)
+
+    ax.set_ylim(bottom=0)
+
+    ax.grid(visible=True, which='both', color='gray', linestyle='-', linewidth=0.5)
+
+    format_label(fig, ax, title)
+
+    interactive_legend = plugins.InteractiveLegendPlugin(lines, labels, alpha_unsel=0.0, alpha_over=1.0)
+
+    plugins.connect(fig, interactive_legend)
+
+    return fig
+
+
+def create_plot(rounds: list, data: list, title: str, label="", max_points: int = 0, method: str = "minmax") -> Figure:
+    """Create the plot for based on the team general data
+    Args:
+        rounds: list: Rounds (x axis)
+        data: list: Data to plot
+        title: str: Title of the plot
+        label: str: Label of the plot
+        max_points: int: Maximum number of points, 0 for all the rounds
+        method: str: Downsampling method ("minmax" or "lttb")
+
+    Returns:
+        Figure: Figure of the plot created
+    """
+
+    fig, ax = new_figure()
+
+    ax.plot(*downsample(rounds, data, max_points, method), linestyle='-', marker='o', markersize=3, alpha=0.6,
+            label=label)
+    ax.set_ylim(bottom=0)
+    ax.grid(True)
+
+    format_label(fig, ax, title)
+
+    return fig
+
+
+def export_figure(fig: Figure) -> tuple[dict, str, str]:
+    """Export the figure for the report bundle.
+
+    Args:
+        fig: Figure: Figure to export
+
+    Returns:
+        tuple: (figure as plain JSON types, CSS of the plugins, Javascript of the plugins)
+    """
+
+    if Exporter is None:
+        # Other versions of mpld3: only the public export, without the CSS and the Javascript of the plugins
+        figure, extra_css, extra_js = mpld3.fig_to_dict(fig), "", ""
+    else:
+        renderer = MPLD3Renderer()
+        Exporter(renderer, close_mpl=False).run(fig)
+        _, figure, extra_css, extra_js = renderer.finished_figures[0]
+
+    return json.loads(json.dumps(figure, default=plain_value)), extra_css, extra_js
+
+
+def plain_value(value):
+    """JSON value of the NumPy scalars and arrays of an exported figure"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def save_plot(fig: Figure, base_path: str, team: str, spec: str, interactive: bool = True) -> None:
+    """Save the plot in the directory.
+
+    Args:
+        fig: Figure: Figure to save
+        base_path: str: Directory that contains the reports directory
+        team: str: Name of the team
+        spec: str: Specification of the plot
+        interactive: bool: Save also the interactive HTML file of the plot
+    """
+
+    path_image = os.path.join(base_path, "reports", "plots_image", f"plot-{team}-{spec}.png")
+
+    if interactive:
+        html_str = mpld3.fig_to_html(fig)
+        path_interactive = os.path.join(base_path, "reports", "plots_interactive", f"plot-{team}-{spec}.html")
+
+        with open(path_interactive, "w") as f:
+            f.write(html_str)
+
+    fig.savefig(path_image)
+
+
+def render_plot(job: dict) -> tuple[str, str, float, tuple | None]:
+    """Create and save the plot described by the job (executed in the worker processes).
+
+    Args:
+        job: dict: Description of the plot (see StatisticManager.add_plot)
+
+    Returns:
+        tuple: (team, spec, seconds spent, exported figure if the job is for the bundle)
+    """
+
+    start = time.perf_counter()
+
+    if job['services'] is not None:
+        fig = create_plot_service_data(job['rounds'], job['data'], job['services'], job['title'],
+                                       max_points=job['max_points'], method=job['downsample'])
+    else:
+        fig = create_plot(job['rounds'], job['data'], job['title'], label=job['label'],
+                          max_points=job['max_points'], method=job['downsample'])
+
+    save_plot(fig, job['base_path'], job['team'], job['spec'], interactive=not job['bundle'])
+    exported = export_figure(fig) if job['bundle'] else None
+
+    return job['team'], job['spec'], time.perf_counter() - start, exported
+
+
+def render_plots(jobs: list[dict], workers: int = 1) -> tuple[float, list[tuple]]:
+    """Render the plots, on a process pool when workers is greater than 1.
+
+    Args:
+        jobs: list: Description of the plots
+        workers: int: Number of processes
+
+    Returns:
+        tuple: (wall-clock time spent, results of render_plot in the order of the jobs)
+    """
+
+    start = time.perf_counter()
+
+    if workers <= 1:
+        results = [render_plot(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render_plot, jobs))
+
+    for team, spec, elapsed, _ in results:
+        logging.info("Plot %s-%s rendered in %.2fs", team, spec, elapsed)
+
+    return time.perf_counter() - start, results
@@ -0,0 +1,151 @@
+import hashlib
+import html
+import json
+
+import mpld3
+
+# Digits kept for the non integer values of the plots (SLA percentages)
+PRECISION = 3
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+details {{ margin: 0.5em 0; }}
+summary {{ cursor: pointer; font-size: 1.1em; }}
+{css}
+</style>
+<script>{d3}</script>
+<script>{mpld3}</script>
+<script>!function(mpld3){{ {plugins} }}(mpld3);</script>
+</head>
+<body>
+<h1>{title}</h1>
+{sections}
+<script type="application/json" id="tables">{tables}</script>
+<script>
+var tables = null;
+function drawPlot(details) {{
+    if (details.dataset.drawn) return;
+    details.dataset.drawn = "1";
+    if (tables === null) tables = JSON.parse(document.getElementById("tables").textContent);
+    var figure = JSON.parse(document.getElementById(details.dataset.figure).textContent);
+    for (var name in figure.data) figure.data[name] = tables[figure.data[name]];
+    mpld3.draw_figure(details.dataset.target, figure);
+}}
+document.querySelectorAll("details[data-figure]").forEach(function (details) {{
+    details.addEventListener("toggle", function () {{ if (details.open) drawPlot(details); }});
+}});
+var linked = location.hash && document.getElementById(location.hash.slice(1));
+if (linked && linked.dataset.figure) linked.open = true;
+</script>
+</body>
+</html>
+"""
+
+SECTION = """<details id="{anchor}" data-figure="{anchor}-json" data-target="{anchor}-plot">
+<summary>{summary}</summary>
+<div id="{anchor}-plot"></div>
+<script type="application/json" id="{anchor}-json">{figure}</script>
+</details>
+"""
+
+
+def compact(value):
+    """Round the floats of a data table (integer floats become int) to shrink the JSON"""
+    if isinstance(value, list):
+        return [compact(item) for item in value]
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else round(value, PRECISION)
+    return value
+
+
+class ReportBundle:
+    """Single self-contained HTML file with all the interactive plots of the report.
+
+    The D3/mpld3 scripts and the plugins are embedded once, the data tables of the plots are de-duplicated (e.g. the
+    rounds shared by all the plots) and every plot is decoded and drawn only when its section is opened.
+    """
+
+    def __init__(self, title: str):
+        self.title = title
+        self.sections = []
+        self.tables = {}
+        self.plugins = {}
+        self.css = {}
+
+    @staticmethod
+    def anchor(team: str, spec: str) -> str:
+        """Id of the section of a plot (usable as #anchor in the links)"""
+        return f"plot-{team}-{spec}"
+
+    def add_table(self, table: list) -> str:
+        """Save a data table once and return its reference.
+        Args:
+            table: list: Data table of mpld3 (rows of values)
+
+        Returns:
+            str: Reference of the table
+        """
+
+        encoded = json.dumps(compact(table), separators=(",", ":"))
+        reference = hashlib.blake2b(encoded.encode(), digest_size=6).hexdigest()
+        self.tables.setdefault(reference, encoded)
+        return reference
+
+    def add(self, team: str, spec: str, title: str, figure: dict, extra_css: str = "", extra_js: str = "") -> None:
+        """Add a plot to the bundle.
+
+        Args:
+            team: str: Name of the team
+            spec: str: Specification of the plot
+            title: str: Title shown in the section
+            figure: dict: Figure exported by mpld3 (see plotting.export_figure)
+            extra_css: str: CSS of the plugins of the figure
+            extra_js: str: Javascript of the plugins of the figure
+        """
+
+        figure = dict(figure, data={name: self.add_table(table) for name, table in figure['data'].items()})
+        if extra_js:
+            self.plugins.setdefault(hashlib.blake2b(extra_js.encode()).hexdigest(), extra_js)
+        if extra_css:
+            self.css.setdefault(hashlib.blake2b(extra_css.encode()).hexdigest(), extra_css)
+
+        anchor = self.anchor(team, spec)
+        self.sections.append(SECTION.format(
+            anchor=anchor,
+            summary=html.escape(f"{team} | {title}"),
+            figure=self.escape_json(json.dumps(figure, separators=(",", ":"))),
+        ))
+
+    @staticmethod
+    def escape_json(encoded: str) -> str:
+        """Make a JSON string safe inside a <script> tag"""
+        return encoded.replace("</", "<\\/")
+
+    def write(self, path: str) -> None:
+        """Write the bundle.
+        Args:
+            path: str: Path of the HTML file
+        """
+
+        with open(mpld3.urls.D3_LOCAL, "r") as f:
+            d3 = f.read()
+        with open(mpld3.urls.MPLD3MIN_LOCAL, "r") as f:
+            mpld3_js = f.read()
+
+        tables = "{" + ",".join(f'"{reference}":{table}' for reference, table in self.tables.items()) + "}"
+
+        with open(path, "w") as f:
+            f.write(TEMPLATE.format(
+                title=html.escape(self.title),
+                css="\n".join(self.css.values()),
+                d3=d3,
+                mpld3=mpld3_js,
+                plugins="\n".join(self.plugins.values()),
+                sections="".join(self.sections),
+                tables=self.escape_json(tables),
+            ))
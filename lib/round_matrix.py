@@ -0,0 +1,185 @@
+import numpy as np
+
+UP = 101
+
+
+class RoundMatrix:
+    """Columnar view of the table and the chart of a team, built once and shared by all the statistics.
+
+    Every per-service array has shape rounds x services, with the columns in the order of ``services``.
+
+    Args:
+        services: list: Name of the services
+        table: dict: Team table (rounds with position, checks, stolen and lost)
+        chart: dict: Team chart (score of every service), optional
+        first_round: int: Round of the first round of the table (e.g. a table decoded from a round onwards)
+    """
+
+    def __init__(self, services: list[str], table: dict = None, chart: dict = None, first_round: int = 0):
+        self.services = list(services)
+        self.index = {service: column for column, service in enumerate(self.services)}
+
+        table_rounds = table['rounds'] if table is not None else []
+        count = len(table_rounds)
+        if chart is not None:
+            chart_count = max(int(chart['rounds']) + 1 - first_round, 0)
+            count = min(count, chart_count) if table is not None else chart_count
+        shape = (count, len(self.services))
+
+        self.rounds = np.arange(first_round, first_round + count)
+        self.status = np.full(shape, UP, dtype=np.int16)
+        self.stolen = np.zeros(shape, dtype=np.int64)
+        self.lost = np.zeros(shape, dtype=np.int64)
+        self.score = np.zeros(shape, dtype=np.int64)
+        self.position = np.zeros(count, dtype=np.int64)
+
+        for round, round_data in enumerate(table_rounds[:count]):
+            self.position[round] = round_data.get('position', 0)
+            for column, service in enumerate(round_data['services'][:len(self.services)]):
+                self.status[round, column] = self.exit_code(service)
+                self.stolen[round, column] = service.get('stolen', 0)
+                self.lost[round, column] = service.get('lost', 0)
+
+        if chart is not None:
+            self.score = np.array([chart['services'][column]['score'][first_round:first_round + count]
+                                   for column in range(len(self.services))]).reshape(len(self.services), count).T
+
+    @classmethod
+    def from_records(cls, services: list[str], records: list) -> 'RoundMatrix':
+        """Build the matrix from the rounds kept by the monitor, without downloading anything.
+        Args:
+            services: list: Name of the services
+            records: list: RoundRecord of consecutive rounds, oldest first
+
+        Returns:
+            RoundMatrix: Matrix of the rounds
+        """
+
+        matrix = cls(services, first_round=records[0].round if records else 0)
+        shape = (len(records), len(matrix.services))
+        matrix.rounds = np.array([record.round for record in records], dtype=np.int64)
+        matrix.status = np.full(shape, UP, dtype=np.int16)
+        matrix.stolen = np.zeros(shape, dtype=np.int64)
+        matrix.lost = np.zeros(shape, dtype=np.int64)
+        matrix.score = np.zeros(shape, dtype=np.int64)
+        matrix.position = np.array([record.position for record in records], dtype=np.int64)
+
+        for round, record in enumerate(records):
+            for service in record.services:
+                column = matrix.index.get(service.service)
+                if column is None:
+                    continue
+                matrix.status[round, column] = service.exit_code
+                matrix.stolen[round, column] = service.stolen
+                matrix.lost[round, column] = service.lost
+                matrix.score[round, column] = service.score
+        return matrix
+
+    @staticmethod
+    def exit_code(service: dict) -> int:
+        """Status of a service in a round: the first failing exitCode, 101 if all the checks are up
+        Args:
+            service: dict: Service of a round of the team table
+
+        Returns:
+            int: Exit code
+        """
+
+        for check in service.get('checks', []):
+            if check['exitCode'] != UP:
+                return check['exitCode']
+        return UP
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def extend(self, other: 'RoundMatrix') -> None:
+        """Append the rounds of another matrix (built from the rounds that follow the last one of this matrix)
+        Args:
+            other: RoundMatrix: Matrix of the new rounds
+        """
+
+        self.rounds = np.concatenate([self.rounds, other.rounds])
+        self.status = np.concatenate([self.status, other.status])
+        self.stolen = np.concatenate([self.stolen, other.stolen])
+        self.lost = np.concatenate([self.lost, other.lost])
+        self.score = np.concatenate([self.score, other.score])
+        self.position = np.concatenate([self.position, other.position])
+
+    @property
+    def up(self) -> np.ndarray:
+        """Boolean matrix rounds x services, True if all the checks of the service are up"""
+        return self.status == UP
+
+    def column(self, matrix: np.ndarray, service: str) -> np.ndarray:
+        """Column of a service.
+        Args:
+            matrix: np.ndarray: Matrix rounds x services
+            service: str: Name of the service
+
+        Returns:
+            np.ndarray: Values of the service
+        """
+
+        return matrix[:, self.index[service]]
+
+    def positions(self, rounds: list[int]) -> np.ndarray:
+        """Rows of the rounds in the arrays (the matrix may not start from round 0)"""
+        return np.asarray(rounds) - (self.rounds[0] if len(self.rounds) else 0)
+
+    def sla(self, rounds: list[int] = None, initial_up: np.ndarray = None) -> np.ndarray:
+        """SLA percentage of every service, cumulative over the rounds.
+        Args:
+            rounds: list: Rounds to use (all by default)
+            initial_up: np.ndarray: Rounds up of every service before the first round of the matrix
+
+        Returns:
+            np.ndarray: Matrix rounds x services
+        """
+
+        rounds = self.rounds if rounds is None else np.asarray(rounds)
+        counters = np.cumsum(self.up[self.positions(rounds)], axis=0)
+        if initial_up is not None:
+            counters = counters + initial_up
+        return (counters / (rounds.reshape(-1, 1) + 1)) * 100
+
+    def team_score(self) -> np.ndarray:
+        """Total score of the team for every round"""
+        return self.score.sum(axis=1)
+
+    def flags(self, stolen_lost: bool, rounds: list[int] = None) -> np.ndarray:
+        """Flags of every service.
+        Args:
+            stolen_lost: bool: True for stolen, False for lost
+            rounds: list: Rounds to use (all by default)
+
+        Returns:
+            np.ndarray: Matrix rounds x services
+        """
+
+        flags = self.stolen if stolen_lost else self.lost
+        return flags if rounds is None else flags[self.positions(rounds)]
+
+    def to_dict(self, matrix: np.ndarray) -> dict[str, list]:
+        """Convert a matrix rounds x services in a dictionary of lists
+        Args:
+            matrix: np.ndarray: Matrix rounds x services
+
+        Returns:
+            dict: Dictionary service -> list of values
+        """
+
+        return columns_to_dict(matrix, self.services)
+
+
+def columns_to_dict(matrix: np.ndarray, services: list[str]) -> dict[str, list]:
+    """Convert a rounds x services matrix in a dictionary of lists
+    Args:
+        matrix: np.ndarray: Matrix rounds x services
+        services: list: Name of the services (one for every column)
+
+    Returns:
+        dict: Dictionary service -> list of values
+    """
+
+    return {service: column.tolist() for service, column in zip(services, matrix.T)}
@@ -0,0 +1,140 @@
+import time
+
+from lib.logger import logging
+
+
+class TickScheduler:
+    """Schedule the polls just after the round boundaries instead of every ``period`` seconds from the previous poll.
+
+    The phase of the boundaries is learned from the polls: a new round appears between the last poll that did not see
+    it and the first one that did. Until the phase is known, and when a poll is early, the scoreboard is polled again
+    after ``retry`` seconds.
+
+    Args:
+        period: float: Duration of a round in seconds
+        margin: float: Seconds to wait after the estimated boundary
+        retry: float: Seconds between the polls while waiting for a new round
+        budget: float: Maximum duration of a tick, longer ticks are reported as overruns
+    """
+
+    # Check the round counter with API.probe_round before fetching the tables
+    probe = False
+
+    def __init__(self, period: float, margin: float = 2, retry: float = 5, budget: float = 10):
+        self.period = period
+        self.margin = margin
+        self.retry = retry
+        self.budget = budget
+
+        self.offset = None
+        self.last_miss = None
+        self.last_hit = None
+        self.latencies = {}
+        self.overruns = 0
+
+    def phase(self, timestamp: float) -> float:
+        """Position of the timestamp in the round, in seconds"""
+        return timestamp % self.period
+
+    def observe(self, timestamp: float, new_round: int | None, duration: float) -> None:
+        """Record the result of a poll.
+
+        Args:
+            timestamp: float: Time of the poll (time.time())
+            new_round: int: Round seen for the first time in this poll, None if the round did not change
+            duration: float: Duration of the tick in seconds
+        """
+
+        if duration > self.budget:
+            self.overruns += 1
+            logging.warning(f"Tick overrun: {duration:.2f}s (budget {self.budget}s, {self.overruns} overruns)")
+
+        if new_round is None:
+            self.last_miss = timestamp
+            return
+
+        first = self.last_hit is None
+        self.last_hit = timestamp
+        if first:
+            # The first poll only tells that a round exists, not when it started
+            return
+
+        if self.last_miss is not None and timestamp - self.last_miss < self.period:
+            # The round started between the last poll that did not see it and this one
+            boundary = (self.last_miss + timestamp) / 2
+            self.offset = self.phase(boundary)
+        elif self.offset is not None:
+            # Seen at the first poll: the round may start earlier than estimated, poll a bit earlier next time
+            boundary = self.boundary_before(timestamp)
+            self.offset = self.phase(self.offset - self.retry / 2)
+        else:
+            return
+
+        self.latencies[new_round] = timestamp - boundary
+        logging.info(f"Round {new_round} detected {self.latencies[new_round]:.1f}s after its start "
+                     f"(rounds start at {self.offset:.1f}s of every {self.period}s)")
+
+    def boundary_before(self, timestamp: float) -> float:
+        """Estimated start of the round in progress at the timestamp"""
+        return timestamp - self.phase(timestamp - self.offset)
+
+    def next_delay(self, timestamp: float = None) -> float:
+        """Seconds to wait before the next poll: ``margin`` seconds after the start of the next round, or ``retry``
+        seconds if the round in progress has not been seen yet.
+
+        Args:
+            timestamp: float: Current time (time.time() if None)
+
+        Returns:
+            float: Delay in seconds
+        """
+
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.offset is None:
+            return self.retry
+
+        boundary = self.boundary_before(timestamp)
+        if self.last_hit >= boundary:
+            return boundary + self.period + self.margin - timestamp
+        if timestamp < boundary + self.margin:
+            return boundary + self.margin - timestamp
+        # Late round
+        return self.retry
+
+
+class AdaptiveScheduler(TickScheduler):
+    """Sleep for most of the round, then probe the round counter every ``probe_interval`` seconds starting ``window``
+    seconds before the expected end of the round; the tables are fetched only when the probe sees a new round.
+
+    Args:
+        period: float: Duration of a round in seconds
+        window: float: Seconds before the expected end of the round when the probes start
+        probe_interval: float: Seconds between the probes
+        budget: float: Maximum duration of a tick, longer ticks are reported as overruns
+    """
+
+    probe = True
+
+    def __init__(self, period: float, window: float = 10, probe_interval: float = 1, budget: float = 10):
+        super().__init__(period, margin=0, retry=probe_interval, budget=budget)
+        self.window = window
+
+    def next_delay(self, timestamp: float = None) -> float:
+        """Seconds to wait before the next probe.
+
+        Args:
+            timestamp: float: Current time (time.time() if None)
+
+        Returns:
+            float: Delay in seconds
+        """
+
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.offset is None:
+            return self.retry
+
+        boundary = self.boundary_before(timestamp)
+        if self.last_hit >= boundary:
+            # Round in progress already checked: sleep until the window before its end
+            return max(boundary + self.period - self.window - timestamp, self.retry)
+        return self.retry
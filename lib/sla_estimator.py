@@ -0,0 +1,173 @@
+from collections import deque
+from itertools import chain, repeat
+
+
+class ServiceSLA:
+    """Running SLA of a service: rounds up over the whole competition and over the last ``window`` rounds.
+
+    Args:
+        window: int: Rounds of the sliding window
+    """
+
+    __slots__ = ("rounds", "up", "last_round", "window", "window_up", "warned")
+
+    def __init__(self, window: int):
+        self.rounds = 0
+        self.up = 0.0
+        self.last_round = None
+        self.window = deque(maxlen=window)
+        self.window_up = 0
+        self.warned = False
+
+    def update(self, round: int, up: bool, reported_sla: float = None) -> bool:
+        """Add a round (the rounds not seen since the previous one take its state, as in the DowntimeTracker).
+        Args:
+            round: int: Number of the round
+            up: bool: True if the service is up
+            reported_sla: float: SLA reported by the scoreboard, used for the rounds before the first one seen
+
+        Returns:
+            bool: False if the round was already added
+        """
+
+        previous, missed = up, 0
+        if self.last_round is None:
+            if reported_sla is not None:
+                # The scoreboard SLA already counts every round up to this one
+                self.rounds = round + 1
+                self.up = reported_sla / 100 * self.rounds
+            else:
+                self.rounds, self.up = 1, float(up)
+        elif round > self.last_round:
+            previous = self.window[-1] if self.window else up
+            missed = round - self.last_round - 1
+            self.rounds += missed + 1
+            self.up += missed * previous + up
+        else:
+            return False
+        self.last_round = round
+
+        # The window gets the missed rounds too, at most a full window
+        for state in chain(repeat(previous, min(missed, self.window.maxlen)), (up,)):
+            if len(self.window) == self.window.maxlen:
+                self.window_up -= self.window[0]
+            self.window.append(state)
+            self.window_up += state
+        return True
+
+    def cumulative(self) -> float:
+        """SLA percentage since the start of the competition"""
+        return self.up / self.rounds * 100 if self.rounds else 100.0
+
+    def recent(self) -> float:
+        """SLA percentage of the last rounds of the window"""
+        return self.window_up / len(self.window) * 100 if self.window else 100.0
+
+    def projection(self, total_rounds: int) -> float:
+        """SLA at the end of the competition if the service keeps the availability of the window.
+        Args:
+            total_rounds: int: Rounds of the whole competition
+
+        Returns:
+            float: Projected SLA percentage
+        """
+
+        remaining = max(total_rounds - self.rounds, 0)
+        return (self.up + self.recent() / 100 * remaining) / max(self.rounds + remaining, 1) * 100
+
+
+class SLAEstimator:
+    """SLA of every service of every team updated at every round checked, without the history of the API.
+
+    Args:
+        window: int: Rounds of the sliding window
+        total_rounds: int: Rounds of the whole competition, for the projection (None to project the SLA of the window)
+        threshold: float: SLA percentage under which a projection is a warning (None for no warnings)
+    """
+
+    def __init__(self, window: int = 30, total_rounds: int = None, threshold: float = None):
+        self.window = window
+        self.total_rounds = total_rounds
+        self.threshold = threshold
+        self.teams = {}
+
+    def get(self, team: str, service: str) -> ServiceSLA:
+        services = self.teams.get(team)
+        if services is None:
+            services = self.teams[team] = {}
+        sla = services.get(service)
+        if sla is None:
+            sla = services[service] = ServiceSLA(self.window)
+        return sla
+
+    def update(self, team: str, service: str, round: int, up: bool, reported_sla: float = None) -> float | None:
+        """Add the state of a service in a round, O(1).
+        Args:
+            team: str: Name of the team
+            service: str: Name of the service
+            round: int: Number of the round
+            up: bool: True if the service is up
+            reported_sla: float: SLA reported by the scoreboard, if any
+
+        Returns:
+            float: Projected SLA if it just went under the threshold, None otherwise
+        """
+
+        sla = self.get(team, service)
+        if not sla.update(round, up, reported_sla) or self.threshold is None:
+            return None
+        if len(sla.window) < sla.window.maxlen:
+            # A few rounds are not enough to project the trend
+            return None
+
+        projected = self.projection(sla)
+        if projected >= self.threshold:
+            sla.warned = False
+        elif not sla.warned:
+            sla.warned = True
+            return projected
+        return None
+
+    def reset(self, team: str) -> None:
+        """Forget the SLA of the team"""
+        self.teams.pop(team, None)
+
+    def projection(self, sla: ServiceSLA) -> float:
+        """End of competition SLA of a service (the window SLA if the length of the competition is not known)"""
+        return sla.projection(self.total_rounds) if self.total_rounds else sla.recent()
+
+    def team(self, team: str) -> dict[str, ServiceSLA]:
+        """Estimators of the services of the team"""
+        return self.teams.get(team, {})
+
+    def summary(self, team: str) -> dict[str, dict]:
+        """Cumulative, window and projected SLA of every service of the team"""
+        return {
+            service: {
+                "cumulative": round(sla.cumulative(), 2),
+                "recent": round(sla.recent(), 2),
+                "projected": round(self.projection(sla), 2),
+            }
+            for service, sla in self.team(team).items()
+        }
+
+    def to_dict(self) -> dict:
+        """Counters and window of every service (JSON serializable, for the checkpoint)"""
+        return {
+            team: {
+                service: {"rounds": sla.rounds, "up": sla.up, "last_round": sla.last_round,
+                          "window": [int(up) for up in sla.window], "warned": sla.warned}
+                for service, sla in services.items()
+            }
+            for team, services in self.teams.items()
+        }
+
+    def restore(self, state: dict) -> None:
+        """Restore the services saved by to_dict (the window is cut to the current size)"""
+        for team, services in state.items():
+            for service, saved in services.items():
+                sla = self.get(team, service)
+                sla.rounds, sla.up, sla.last_round = saved["rounds"], saved["up"], saved["last_round"]
+                sla.window.extend(bool(up) for up in saved["window"])
+                sla.window_up = sum(sla.window)
+                sla.warned = saved["warned"]
@@ -2,26 +2,46 @@ import logging
 import os
 from datetime import datetime
 
-import mpld3
-from matplotlib import pyplot as plt
-from matplotlib.figure import Figure
-from mpld3 import plugins
-
 from lib.API import API
+from lib.downtime import DowntimeTracker
+from lib.field_analytics import FieldAnalytics
+from lib.http_client import APIError
+from lib.plotting import render_plots
+from lib.report_bundle import ReportBundle
+from lib.round_matrix import RoundMatrix
+from lib.utils import get_option
 
 
 class StatisticManager:
-    def __init__(self, teams_name: list, downtime_count: dict[str, int], services: list):
-        self.teams = teams_name
+    def __init__(self, teams_name: list, downtime_count: dict[str, int], services: list,
+                 matrices: dict[str, RoundMatrix] = None, downtime: DowntimeTracker = None):
+        self.teams = list(teams_name)
         self.downtime_count = downtime_count
+        self.downtime = downtime
         self.services = services
 
         self.base_path = os.path.abspath(os.getcwd())
         self.init_directory()
         self.file_report = self.init_file_report()
 
-        self.api = API()
-        self.rounds = [round for round in range(self.api.get_round(self.teams[0]) + 1)]
+        # One table and one chart for every team (+1 for the chart used to read the round)
+        # The round of the cached documents is checked again at most once per round
+        self.api = API(cache_size=get_option('cache_size', 2 * len(teams_name) + 1),
+                       round_ttl=get_option('reload', 120))
+        if matrices:
+            # Data already collected during the competition (incremental report), nothing to download
+            self.matrices = matrices
+            self.rounds = [round for round in range(min(len(matrix) for matrix in matrices.values()))]
+        else:
+            self.matrices = {}
+            self.rounds = [round for round in range(self.api.get_round(self.teams[0]) + 1)]
+        self.plot_jobs = []
+        self.plot_workers = get_option('plot_workers', 1)
+        self.bundle = get_option('report_bundle', False)
+        self.plot_points = get_option('plot_points', 0)
+        self.downsample = get_option('downsample', "minmax")
+        self.field = None
+        self.field_loaded = False
 
         self.total_flags_lost = {team: {service: 0 for service in self.services} for team in teams_name}
         self.total_flags_submitted = {team: {service: 0 for service in self.services} for team in teams_name}
@@ -33,6 +53,19 @@ class StatisticManager:
         self.max_rank = {team: {} for team in teams_name}
         self.min_rank = {team: {} for team in teams_name}
 
+    def add_team(self, team: str) -> None:
+        """Add a team found during the competition (watch_all mode)
+        Args:
+            team: str: Name of the team
+        """
+
+        self.teams.append(team)
+        self.total_flags_lost[team] = {service: 0 for service in self.services}
+        self.total_flags_submitted[team] = {service: 0 for service in self.services}
+        for aggregate in (self.max_score, self.min_score, self.max_score_service, self.min_score_service, self.min_sla,
+                          self.max_rank, self.min_rank):
+            aggregate[team] = {}
+
     # * ------------------ Init functions  ------------------
 
     def init_directory(self):
@@ -53,12 +86,14 @@ class StatisticManager:
 
         path_file_report = os.path.join(self.base_path, "reports",
                                         f"report-{datetime.now().strftime("%d-%m-%y_%H-%M")}.md")
+        self.path_bundle = f"{os.path.splitext(path_file_report)[0]}.html"
         file_report = open(path_file_report, "w")
         file_report.write(f"""
 # Report statistic A/D {datetime.now().strftime("%d-%m-%y|%H:%M")}
         
 **For disable this feature go in config.json and uncheck "report"**
         """)
+        self.header_end = file_report.tell()
 
         return file_report
 
@@ -67,6 +102,12 @@ class StatisticManager:
     def generate_plots(self):
         """Generate the statistic for the teams"""
         logging.info("Generating Statistic")
+        self.queue_plots()
+        jobs, self.plot_jobs = self.plot_jobs, []
+        self.render_queued(jobs)
+
+    def queue_plots(self) -> None:
+        """Compute the data of the plots of every team and queue them in plot_jobs"""
         for team in self.teams:
             self.gen_teams_score_plot(team)
             self.gen_teams_services_score_plot(team)
@@ -74,17 +115,51 @@ class StatisticManager:
             self.gen_flags_stolen_service_plot(team)
             self.gen_flags_lost_service_plot(team)
             self.gen_teams_position_plot(team)
-        logging.info(f"Statistic Generated")
+            self.gen_field_plot(team)
+
+    def render_queued(self, jobs: list[dict]) -> None:
+        """Render the plots queued by queue_plots and write the bundle (only reads the jobs, so it can run in another
+        thread while the next rounds are collected)
+        Args:
+            jobs: list: Description of the plots
+        """
+
+        elapsed, results = render_plots(jobs, workers=self.plot_workers)
+
+        if self.bundle:
+            bundle = ReportBundle(f"Report statistic A/D {datetime.now().strftime("%d-%m-%y|%H:%M")}")
+            for job, (team, spec, _, exported) in zip(jobs, results):
+                bundle.add(team, spec, job['title'], *exported)
+            bundle.write(self.path_bundle)
+            logging.info(f"Interactive report saved in {self.path_bundle}")
+
+        logging.info(f"Statistic Generated in {elapsed:.2f}s ({self.plot_workers} workers)")
 
     def generate_report(self) -> None:
         """Generate the report for the teams."""
 
         logging.info("Generating report")
+        self.clear_report()
         for team in self.teams:
             content = self.generate_team_content(team)
             self.file_report.write(content)
+        self.file_report.flush()
+        logging.info(f"API cache: {self.api.cache}")
         logging.info(f"Report generated and saved in {os.path.abspath(self.file_report.name)}")
 
+    def generate_snapshot(self) -> None:
+        """Rewrite the report with only the panoramic section of the teams (partial report during the competition)."""
+
+        self.clear_report()
+        for team in self.teams:
+            self.file_report.write(self.generate_panoramic_section(team))
+        self.file_report.flush()
+
+    def clear_report(self) -> None:
+        """Remove everything written after the header of the report"""
+        self.file_report.seek(self.header_end)
+        self.file_report.truncate()
+
     def generate_team_content(self, team: str) -> str:
         """Generate the content of report for the team.
         Args:
@@ -94,6 +169,7 @@ class StatisticManager:
             str: Content of the report
         """
         content = self.generate_panoramic_section(team)
+        content += self.generate_field_section(team)
         content += self.generate_score_team_section(team)
         content += self.generate_score_service_section(team)
         content += self.generate_sla_service_section(team)
@@ -120,69 +196,146 @@ class StatisticManager:
 - **Min sla:** {self.format_results(self.min_sla, team)}
 - **Max score for service:** {self.format_results(self.max_score_service, team)}
 - **Min score for service:** {self.format_results(self.min_score_service, team)}
-- **Numbers of downtime:** {self.downtime_count[team]}
+- **Numbers of downtime:** {self.format_downtime(team)}
 """
 
-    @staticmethod
-    def generate_score_team_section(team: str) -> str:
+    def generate_field_section(self, team: str) -> str:
+        field = self.field_analytics()
+        if field is None or team not in field or not self.rounds or len(field) < len(self.rounds):
+            return ""
+
+        summary = field.summary(team, self.rounds[-1])
+        return f"""
+### Field:
+
+- **Position:** {summary['position']} of {len(field.teams)}
+- **Best/worst position:** {summary['best_position']}/{summary['worst_position']}
+- **Gap to the team above:** {summary['gap_above']}
+- **Gap to the team below:** {summary['gap_below']}
+- **Rank volatility (last {field.window} rounds):** {summary['volatility']}
+- **Percentile:** {summary['percentile']}
+
+![plot_field]({os.path.join("/", "reports", "plots_image", f"plot-{team}-field.png")})
+
+**Interactive (better visual)**: {self.interactive_path(team, "field")}
+"""
+
+    def generate_score_team_section(self, team: str) -> str:
         return f"""
 ### Score Team
 
 ![plot_score]({os.path.join("/", "reports", "plots_image", f"plot-{team}-team_score.png")})
 
-**Interactive (better visual)**: {os.path.abspath(os.path.join("reports", "plots_interactive", f"plot-{team}-team_score.html"))}
+**Interactive (better visual)**: {self.interactive_path(team, "team_score")}
 """
 
-    @staticmethod
-    def generate_score_service_section(team: str) -> str:
+    def generate_score_service_section(self, team: str) -> str:
         return f"""     
 ### Score Service
 
 ![plot_score]({os.path.join("/", "reports", "plots_image", f"plot-{team}-team_services_score.png")})
 
-**Interactive (better visual)**:{os.path.abspath(os.path.join("reports", "plots_interactive", f"plot-{team}-team_services_score.html"))}
+**Interactive (better visual)**:{self.interactive_path(team, "team_services_score")}
 
 ---      
 """
 
-    @staticmethod
-    def generate_sla_service_section(team: str) -> str:
+    def generate_sla_service_section(self, team: str) -> str:
         return f"""      
 ### Sla Service
 
 ![plot_sla]({os.path.join("/", "reports", "plots_image", f"plot-{team}-sla.png")})
 
-**Interactive (better visual)**:{os.path.abspath(os.path.join("reports", "plots_interactive", f"plot-{team}-sla.html"))}
+**Interactive (better visual)**:{self.interactive_path(team, "sla")}
 
 ---
 """
 
-    @staticmethod
-    def generate_flag_lost_section(team: str) -> str:
+    def generate_flag_lost_section(self, team: str) -> str:
         return f"""      
 ### Flag lost
 
 ![plot_sla]({os.path.join("/", "reports", "plots_image", f"plot-{team}-flags_lost.png")})
 
-**Interactive (better visual)**:{os.path.abspath(os.path.join("reports", "plots_interactive", f"plot-{team}-flags_lost.html"))}
+**Interactive (better visual)**:{self.interactive_path(team, "flags_lost")}
 
 ---
 """
 
-    @staticmethod
-    def generate_flag_submitted_section(team: str) -> str:
+    def generate_flag_submitted_section(self, team: str) -> str:
         return f"""      
 ### Flag submitted
 
 ![plot_sla]({os.path.join("/", "reports", "plots_image", f"plot-{team}-flags_submitted.png")})
 
-**Interactive (better visual)**:{os.path.abspath(os.path.join("reports", "plots_interactive", f"plot-{team}-flags_submitted.html"))}
+**Interactive (better visual)**:{self.interactive_path(team, "flags_submitted")}
 
 ---
 """
 
     # * ------------------ Utils function  ------------------
 
+    def interactive_path(self, team: str, spec: str) -> str:
+        """Path of the interactive version of a plot (a section of the bundle in bundle mode).
+        Args:
+            team: str: Name of the team
+            spec: str: Specification of the plot
+
+        Returns:
+            str: Path of the interactive plot
+        """
+
+        if self.bundle:
+            return f"{self.path_bundle}#{ReportBundle.anchor(team, spec)}"
+        return os.path.abspath(os.path.join("reports", "plots_interactive", f"plot-{team}-{spec}.html"))
+
+    def matrix(self, team: str) -> RoundMatrix:
+        """Get the columnar data of the team, downloaded and built only the first time.
+        Args:
+            team: str: Name of the team
+
+        Returns:
+            RoundMatrix: Columnar data of the team
+        """
+
+        if team not in self.matrices:
+            self.matrices[team] = self.api.get_round_matrix(team, self.services)
+            self.rounds = self.rounds[:len(self.matrices[team])]
+        return self.matrices[team]
+
+    def field_analytics(self) -> FieldAnalytics | None:
+        """Analytics of all the teams, from the global chart of the last round (downloaded only the first time).
+        Returns:
+            FieldAnalytics: Analytics of the field, None if the global chart is not available
+        """
+
+        if not self.field_loaded and self.rounds:
+            self.field_loaded = True
+            try:
+                self.field = FieldAnalytics.from_global_chart(self.api.get_global_chart(self.rounds[-1]))
+            except (APIError, KeyError, TypeError, ValueError) as e:
+                logging.error(f"Global chart not available, the field section is skipped: {e}")
+        return self.field
+
+    def format_downtime(self, team: str) -> str:
+        """Downtime of the team for the report: outages of the tracker of the monitor, the count of the failed
+        checks if there is no tracker
+        Args:
+            team: str: Name of the team
+
+        Returns:
+            str: Formatted downtime
+        """
+
+        if self.downtime is None:
+            return str(self.downtime_count[team])
+
+        summary = self.downtime.summary(team)
+        mttr = f"{summary['mttr']} rounds" if summary['mttr'] is not None else "n/a"
+        mtbf = f"{summary['mtbf']} rounds" if summary['mtbf'] is not None else "n/a"
+        return (f"{summary['outages']} ({summary['down_rounds']} rounds down, longest outage "
+                f"{summary['longest_outage']} rounds, MTTR {mttr}, MTBF {mtbf})")
+
     @staticmethod
     def format_results(results: dict, team: str) -> str:
         """Format the result for the report
@@ -198,41 +351,32 @@ class StatisticManager:
             ["\n\t- " + key + ": " + str(results[team][key]) + ", " for key in results[team].keys()])
         return formatted_result
 
-    @staticmethod
-    def format_label(title: str) -> None:
-        """Format the label of the plot.
+    def add_plot(self, team: str, spec: str, data: list | dict, title: str, services: list = None,
+                 label: str = "") -> None:
+        """Queue a plot, rendered by generate_plots.
 
         Args:
-            title: str: Title of the plot
-        """
-
-        plt.xlabel('Round')
-        plt.ylabel('Score')
-        plt.title(title)
-        plt.grid(True)
-        plt.legend()
-
-        plt.gcf().autofmt_xdate()
-
-    def save_plot(self, fig: Figure, team: str, spec: str) -> None:
-        """Save the plot in the directory.
-
-        Args:
-            fig: Figure: Figure to save
             team: str: Name of the team
-            spec: str: Specification of the plot
+            spec: str: Specification of the plot (used in the file name)
+            data: list | dict: Values (a dictionary service -> values for the plots of the services)
+            title: str: Title of the plot
+            services: list: Services to plot, None for a single line plot
+            label: str: Label of the single line
         """
 
-        html_str = mpld3.fig_to_html(fig)
-
-        path_image = os.path.join(self.base_path, "reports", "plots_image", f"plot-{team}-{spec}.png")
-        path_interactive = os.path.join(self.base_path, "reports", "plots_interactive", f"plot-{team}-{spec}.html")
-
-        with open(path_interactive, "w") as f:
-            f.write(html_str)
-
-        plt.savefig(path_image)
-        plt.close()
+        self.plot_jobs.append({
+            'team': team,
+            'spec': spec,
+            'rounds': self.rounds,
+            'data': data,
+            'title': title,
+            'services': services,
+            'label': label,
+            'base_path': self.base_path,
+            'bundle': self.bundle,
+            'max_points': self.plot_points,
+            'downsample': self.downsample,
+        })
 
     # * ------------------ Generation of statistic  ------------------
 
@@ -242,15 +386,14 @@ class StatisticManager:
             team: str: Name of the team
         """
 
-        service_data = self.api.get_score_service(team=team, services=self.services)
+        matrix = self.matrix(team)
+        service_data = matrix.to_dict(matrix.score[self.rounds])
 
         for service in self.services:
             self.max_score_service[team][service] = max(service_data[service])
             self.min_score_service[team][service] = min(service_data[service])
 
-        fig = self.create_plot_service_data(title=f"Services score: {team}", service_data=service_data, )
-
-        self.save_plot(fig, team, "team_services_score")
+        self.add_plot(team, "team_services_score", service_data, title=f"Services score: {team}", services=self.services)
 
     def gen_sla_service_score_plot(self, team: str) -> None:
         """Generate the plot for the sla of the services
@@ -258,13 +401,13 @@ class StatisticManager:
             team: str: Name of the team
         """
 
-        service_data = self.api.get_sla_services(team=team, services=self.services, rounds=self.rounds)
+        matrix = self.matrix(team)
+        service_data = matrix.to_dict(matrix.sla(self.rounds))
 
         for service in self.services:
             self.min_sla[team][service] = min(service_data[service])
 
-        fig = self.create_plot_service_data(title=f"Sla value: {team}", service_data=service_data)
-        self.save_plot(fig, team, "sla")
+        self.add_plot(team, "sla", service_data, title=f"Sla value: {team}", services=self.services)
 
     def gen_teams_score_plot(self, team: str) -> None:
         """Generate the plot for the score of the team
@@ -272,14 +415,11 @@ class StatisticManager:
             team: str: Name of the team
         """
 
-        team_data = self.api.get_score_team(team=team, services=self.services)
+        team_data = self.matrix(team).team_score()[self.rounds].tolist()
 
         self.max_score[team], self.min_score[team] = max(team_data), min(team_data)
 
-        fig = self.create_plot(data=team_data, team=team, label="Score")
-        self.save_plot(fig, team, "team_score")
-
-        plt.close()
+        self.add_plot(team, "team_score", team_data, title=f'Score trend for Team {team}', label="Score")
 
     def gen_teams_position_plot(self, team: str) -> None:
         """Generate the plot for the position (in the leaderboard) of the team
@@ -287,20 +427,17 @@ class StatisticManager:
             team: str: Name of the team
         """
 
-        team_data = self.api.get_team_table(team)
-        logging.debug(team)
-
-        logging.debug(f"Data fetched: {len(team_data)}")
-
-        team_data = [round['position'] for round in team_data['rounds']]
+        field = self.field_analytics()
+        if field is not None and team in field and len(field) >= len(self.rounds):
+            # Positions of the global chart, the table of the team is not needed
+            team_data = field.trajectory(team)[self.rounds].tolist()
+        else:
+            team_data = self.matrix(team).position[self.rounds].tolist()
 
         self.max_rank[team] = max(team_data)
         self.min_rank[team] = min(team_data)
 
-        fig = self.create_plot(data=team_data, team='position', label="Position")
-        self.save_plot(fig, team, "rank_team")
-
-        plt.close()
+        self.add_plot(team, "rank_team", team_data, title='Score trend for Team position', label="Position")
 
     def gen_flags_lost_service_plot(self, team: str) -> None:
         """Generate the plot for the flags lost by the team for the services
@@ -308,14 +445,13 @@ class StatisticManager:
             team: str: Name of the team
         """
 
-        service_data = self.api.get_flags_services(team=team, services=self.services,
-                                                   rounds=self.rounds, stolen_lost=False)
+        matrix = self.matrix(team)
+        service_data = matrix.to_dict(matrix.flags(stolen_lost=False, rounds=self.rounds))
 
         for service in self.services:
-            self.total_flags_lost[team][service] += service_data[service][-1]
+            self.total_flags_lost[team][service] = service_data[service][-1]
 
-        fig = self.create_plot_service_data(title=f"Flags lost: {team}", service_data=service_data)
-        self.save_plot(fig, team, "flags_lost")
+        self.add_plot(team, "flags_lost", service_data, title=f"Flags lost: {team}", services=self.services)
 
     def gen_flags_stolen_service_plot(self, team: str) -> None:
         """Generate the plot for the flags stolen by the team for the services
@@ -323,64 +459,23 @@ class StatisticManager:
             team: str: Name of the team
 
         """
-        service_data = self.api.get_flags_services(team=team, services=self.services,
-                                                   rounds=self.rounds, stolen_lost=True)
+        matrix = self.matrix(team)
+        service_data = matrix.to_dict(matrix.flags(stolen_lost=True, rounds=self.rounds))
 
         for service in self.services:
-            self.total_flags_submitted[team][service] += service_data[service][-1]
+            self.total_flags_submitted[team][service] = service_data[service][-1]
 
-        fig = self.create_plot_service_data(title=f"Flags stolen: {team}", service_data=service_data)
-        self.save_plot(fig, team, "flags_submitted")
+        self.add_plot(team, "flags_submitted", service_data, title=f"Flags stolen: {team}", services=self.services)
 
-    # * ------------------ Plot creation  ------------------
-    def create_plot_service_data(self, service_data: dict, title: str) -> Figure:
-        """Create the plot based on the single services
+    def gen_field_plot(self, team: str) -> None:
+        """Generate the plot of the score of the team against the percentiles of the whole field
         Args:
-            service_data: dict: Service data
-            title: str: Title of the plot
-
-        Returns:
-            Figure: Figure of the plot created
-        """
-
-        fig, ax = plt.subplots(figsize=(20, 10))
-
-        lines = []
-        labels = []
-        for service in self.services:
-            line, = ax.plot(self.rounds, service_data[service], label=service, alpha=0.6)
-            lines.append(line)
-            labels.append(service)
-
-        plt.ylim(bottom=0)
-
-        plt.grid(visible=True, which='both', color='gray', linestyle='-', linewidth=0.5)
-
-        self.format_label(title)
-
-        interactive_legend = plugins.InteractiveLegendPlugin(lines, labels, alpha_unsel=0.0, alpha_over=1.0)
-
-        plugins.connect(fig, interactive_legend)
-
-        return fig
-
-    def create_plot(self, data: list, team: str, label="") -> Figure:
-        """Create the plot for based on the team general data
-        Args:
-            data: list: Data to plot
             team: str: Name of the team
-            label: str: Label of the plot
-
-        Returns:
-            Figure: Figure of the plot created
         """
 
-        fig, ax = plt.subplots(figsize=(20, 10))
-
-        plt.plot(self.rounds, data, linestyle='-', marker='o', markersize=3, alpha=0.6, label=label)
-        plt.ylim(bottom=0)
-        plt.grid(True)
-
-        self.format_label(f'Score trend for Team {team}')
+        field = self.field_analytics()
+        if field is None or team not in field or len(field) < len(self.rounds):
+            return
 
-        return fig
+        lines = field.bands_with(team, self.rounds)
+        self.add_plot(team, "field", lines, title=f"Score against the field: {team}", services=list(lines))
@@ -0,0 +1,152 @@
+import io
+import json
+from collections import deque
+from itertools import islice
+from typing import IO, Any, Iterable
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Fields of the team table read by SLANotifier (checks and stored records) and by the StatisticManager
+ROUND_FIELDS = ('position', 'services')
+SERVICE_FIELDS = ('shortname', 'checks', 'stolen', 'lost', 'score', 'sla')
+CHECK_FIELDS = ('exitCode', 'stdout', 'action')
+
+
+def prune_round(round_data: dict) -> dict:
+    """Keep only the fields of the round that are read by the tool.
+    Args:
+        round_data: dict: Round of the team table
+
+    Returns:
+        dict: Pruned round
+    """
+
+    pruned = {field: round_data[field] for field in ROUND_FIELDS if field in round_data}
+    pruned['services'] = [
+        {
+            **{field: service[field] for field in SERVICE_FIELDS if field in service},
+            'checks': [{field: check.get(field) for field in CHECK_FIELDS} for check in service.get('checks', [])]
+        }
+        for service in round_data.get('services', [])
+    ]
+    return pruned
+
+
+def select_rounds(rounds: Iterable[dict], selection: slice) -> tuple[list[dict], int, int | None]:
+    """Materialize only the selected rounds of a stream of rounds.
+
+    A slice with a non-negative start and stop stops reading the stream at the end of the range, a slice like
+    ``slice(-n, None)`` keeps only the last n rounds in memory.
+
+    Args:
+        rounds: Iterable: Stream of the rounds
+        selection: slice: Rounds to keep (step not supported)
+
+    Returns:
+        tuple: (selected rounds, index of the first selected round, total number of rounds or None if not read)
+    """
+
+    start, stop = selection.start, selection.stop
+
+    if (start is None or start >= 0) and stop is not None and stop >= 0:
+        start = start or 0
+        return [prune_round(round_data) for round_data in islice(rounds, start, stop)], start, None
+
+    if start is not None and start < 0 and stop is None:
+        count = 0
+        window = deque(maxlen=-start)
+        for round_data in rounds:
+            window.append(round_data)
+            count += 1
+        return [prune_round(round_data) for round_data in window], count - len(window), count
+
+    if (start is None or start >= 0) and stop is None:
+        start = start or 0
+        selected = [prune_round(round_data) for round_data in islice(rounds, start, None)]
+        return selected, start, start + len(selected)
+
+    every_round = list(rounds)
+    first = range(len(every_round))[selection][:1]
+    return ([prune_round(round_data) for round_data in every_round[selection]],
+            first[0] if first else len(every_round), len(every_round))
+
+
+def parse_team_table(body: bytes, team: str, selection: slice) -> dict:
+    """Decode only the selected rounds of a team table.
+
+    With ijson the document is streamed and only the selected rounds are built, without it the whole document is
+    decoded and then sliced.
+
+    Args:
+        body: bytes: Raw JSON of the team table
+        team: str: Name of the team
+        selection: slice: Rounds to decode, e.g. slice(-1, None) for the last round
+
+    Returns:
+        dict: Team table with only the selected rounds, 'roundOffset' (index of the first one) and 'roundsCount'
+    """
+
+    if ijson is not None:
+        rounds = ijson.items(io.BytesIO(body), 'rounds.item', use_float=True)
+    else:
+        rounds = json.loads(body)['rounds']
+
+    selected, offset, count = select_rounds(rounds, selection)
+
+    return {
+        'teamShortname': team,
+        'services': [{'shortname': service['shortname']} for service in selected[0]['services']] if selected else [],
+        'rounds': selected,
+        'roundOffset': offset,
+        'roundsCount': count,
+    }
+
+
+def split_global_table(table: dict, round_number: int, teams: set[str] | None = None) -> dict[str, dict]:
+    """Split the global table of a round into the data of every team, in the same format of parse_team_table with
+    only that round.
+
+    Args:
+        table: dict: Global table of the round
+        round_number: int: Number of the round
+        teams: set: Teams to keep, None for all
+
+    Returns:
+        dict: Data of every team
+    """
+
+    data = {}
+    for entry in table['teams']:
+        team = entry['shortname']
+        if teams is not None and team not in teams:
+            continue
+        data[team] = {
+            'teamShortname': team,
+            'services': [{'shortname': service['shortname']} for service in entry.get('services', [])],
+            'rounds': [prune_round(entry)],
+            'roundOffset': round_number,
+            'roundsCount': round_number + 1,
+        }
+    return data
+
+
+def read_key(stream: IO[bytes], key: str) -> Any:
+    """Read a top level value of a JSON document.
+
+    With ijson the stream is read only up to the value (the rest of the document is not downloaded if the stream is a
+    response body), without it the whole document is decoded.
+
+    Args:
+        stream: IO: Stream of the raw JSON
+        key: str: Top level key
+
+    Returns:
+        Any: The value, None if the key is missing
+    """
+
+    if ijson is not None:
+        return next(ijson.items(stream, key, use_float=True), None)
+    return json.load(stream).get(key)
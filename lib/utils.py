@@ -14,6 +14,58 @@ def get_config():
     return logging_level, targets, reload, report
 
 
+def get_option(name: str, default: Any = None) -> Any:
+    """Get an optional parameter from config.json.
+
+    Args:
+        name: str: Name of the parameter
+        default: Any: Value returned when the parameter is missing
+
+    Returns:
+        Any: Value of the parameter
+    """
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+
+    return config.get(name, default)
+
+
+def tick_record(team_data: dict, timestamp: str, sla: dict = None) -> dict:
+    """Build the record of a team (see serialize) from the last round of its table.
+
+    Args:
+        team_data: dict: Table of the team
+        timestamp: str: Time of the tick in ISO format
+        sla: dict: SLA estimators of the services (see SLAEstimator.team), for the scoreboards without the SLA
+
+    Returns:
+        dict: Record of the team
+    """
+
+    last_round = team_data['rounds'][-1]
+    sla = sla or {}
+    stats_service = [
+        {
+            'name_service': service['shortname'],
+            'score_service': service.get('score', 0),
+            'flags_submitted': service.get('stolen', 0),
+            'flags_lost': service.get('lost', 0),
+            'sla_value': service['sla'] if service.get('sla') is not None else (
+                round(sla[service['shortname']].cumulative(), 2) if service['shortname'] in sla else None),
+            'is_down': int(any(check['exitCode'] != 101 for check in service.get('checks', []))),
+            'timestamp': timestamp
+        }
+        for service in last_round['services']
+    ]
+
+    return {
+        'name_team': team_data['teamShortname'],
+        'rank_team': last_round.get('position'),
+        'score_team': sum(service['score_service'] for service in stats_service),
+        'stats_service': stats_service
+    }
+
+
 def serialize(records: list) -> list[tuple]:
     serialized_records = []
     for record in records:
@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from sys import argv
 from typing import Any
@@ -7,42 +8,152 @@ import colorama
 from plyer import notification
 
 from lib.API import API
-from lib.logger import logging
-from lib.statistic_manager import StatisticManager
-from lib.utils import get_config
+from lib.checkpoint import Checkpoint
+from lib.db_manager import DBManager
+from lib.downtime import DowntimeTracker
+from lib.history import History
+from lib.http_client import APIError
+from lib.logger import logging, set_level, set_output
+from lib.metrics import metrics, start_server
+from lib.notifier import NotificationDispatcher, create_dispatcher
+from lib.scheduler import AdaptiveScheduler, TickScheduler
+from lib.sla_estimator import SLAEstimator
+from lib.table_parser import split_global_table
+from lib.utils import get_config, get_option, tick_record
+
+# Rounds of the field appended from their global tables, after a longer gap the global chart is downloaded again
+FIELD_MAX_APPEND = 10
 
 
 class SLANotifier:
 
-    def __init__(self, create_report: bool, target_team: list[str] = None):
-        self.target_team = target_team
+    def __init__(self, create_report: bool, target_team: list[str] = None, fetch_workers: int = 1,
+                 database: str = None, checkpoint: str = None, report_every: int = 0,
+                 scheduler: TickScheduler = None, notifier: NotificationDispatcher = None, watch: str = "teams",
+                 watch_all: bool = False, field_analytics: bool = False, history_rounds: int = 0,
+                 sla_window: int = 30, total_rounds: int = None, sla_threshold: float = None):
+        self.target_team = list(target_team or [])
+        if watch_all and watch != "global":
+            # The teams to watch are read from the global table
+            logging.warning("watch_all requires the global watch, switching to \"watch\": \"global\"")
+            watch = "global"
+        self.watch = watch
+        self.watch_all = watch_all
+        self.field_analytics = field_analytics
+        if create_report and report_every:
+            # The incremental report takes the rounds checked between two updates from the history
+            history_rounds = max(history_rounds, 2 * report_every)
+        self.history = History(history_rounds) if history_rounds else None
+        self.field = None
+        self.last_table = (None, None)
         self.create_report = create_report
+        self.report_every = report_every
+        self.report = None
+        self.fetch_workers = fetch_workers
+        self.scheduler = scheduler
+        self.notifier = notifier if notifier is not None else create_dispatcher({})
 
         self.exec_counter = 0
 
-        self.downtime_count = {team: 0 for team in target_team}
-        self.notified = {team: False for team in target_team}
+        self.downtime_count = {}
+        self.notified = {}
         self.services = []
+        self.fetch_latency = {}
+        self.last_round = {}
+        for team in self.target_team:
+            self.add_state(team)
+        self.global_round = None
+        self.global_resync = False
+        self.downtime = DowntimeTracker()
+        self.sla = SLAEstimator(sla_window, total_rounds, sla_threshold)
+        self.probed_round = None
+        self.pending_round = None
+        self.probes = 0
 
         self.api = API()
 
-    @staticmethod
-    def notify(name_service: str, team: str) -> None:
-        """Notify the user that a service is down
+        self.db = None
+        if database:
+            self.db = DBManager(database)
+            self.db.start_writer()
+
+        self.checkpoint = None
+        if checkpoint:
+            self.checkpoint = Checkpoint(checkpoint)
+            state = self.checkpoint.load()
+            if state is not None:
+                self.restore(state)
+
+    def get_state(self) -> dict:
+        """State of the monitor saved in the checkpoint
+        Returns:
+            dict: JSON serializable state
+        """
+
+        return {
+            "targets": self.target_team,
+            "exec_counter": self.exec_counter,
+            "downtime_count": self.downtime_count,
+            "notified": self.notified,
+            "services": self.services,
+            "last_round": self.last_round,
+            "downtime": self.downtime.to_dict(),
+            "sla": self.sla.to_dict(),
+            "saved_at": time.time(),
+        }
+
+    def restore(self, state: dict) -> None:
+        """Restore the state saved by a previous execution, only for the teams that are still targets
+        Args:
+            state: dict: State saved in the checkpoint
+        """
+
+        if self.watch_all:
+            for team in state["targets"]:
+                self.add_team(team)
+        teams = [team for team in self.target_team if team in state["targets"]]
+        for team in teams:
+            self.downtime_count[team] = state["downtime_count"][team]
+            self.notified[team] = state["notified"][team]
+            self.last_round[team] = state["last_round"][team]
+        self.downtime = DowntimeTracker.from_dict({team: state.get("downtime", {})[team] for team in teams
+                                                   if team in state.get("downtime", {})})
+        self.sla.restore({team: state.get("sla", {})[team] for team in teams if team in state.get("sla", {})})
+        self.exec_counter = state["exec_counter"]
+        self.services = state["services"]
+
+        logging.info(f"State restored for {teams} | saved {time.time() - state['saved_at']:.0f}s ago "
+                     f"| last rounds: {self.last_round}")
+
+    def add_state(self, team: str) -> None:
+        """Initialize the state of a team"""
+        self.downtime_count[team] = 0
+        self.notified[team] = False
+        self.last_round[team] = -1
+
+    def add_team(self, team: str) -> None:
+        """Start watching a team (watch_all mode)
         Args:
-            name_service: str: Name of the service
             team: str: Name of the team
+        """
 
-        Returns:
-            None
+        if team not in self.last_round:
+            self.target_team.append(team)
+            self.add_state(team)
+            if self.report is not None:
+                self.report.add_team(team)
+
+    def reset_team(self, team: str) -> None:
+        """Forget the state of the team (e.g. restored from another competition)
+        Args:
+            team: str: Name of the team
         """
-        notification.notify(
-            title='Alert',
-            message=f'The service: {name_service} is down for target {team} | {datetime.now().strftime("%H:%M:%S")}',
-            timeout=10
-        )
-        logging.info(
-            f'Notification sent for service {name_service} in team {team}.')
+
+        self.downtime_count[team] = 0
+        self.notified[team] = False
+        self.last_round[team] = -1
+        self.downtime.reset(team)
+        self.sla.reset(team)
 
     def check_notify(self, services_status: list, team: str) -> None:
         """Check the status of the services and notify if some service is down
@@ -64,31 +175,128 @@ class SLANotifier:
                 service_down = True
                 down_services.append(service['name_service'])
                 self.downtime_count[team] += 1
-                logging.warning(
-                    f"Service {service['name_service']} is down | {service['stdout']} | {service['action']} | {service['exitCode']}")
+                metrics.inc("downtimes", team=team, service=service['name_service'])
+                logging.warning("Service %s is down | %s | %s | %s", service['name_service'], service['stdout'],
+                                service['action'], service['exitCode'])
 
                 if not self.notified[team]:
-                    self.notify(name_service=service['name_service'], team=team)
+                    self.notifier.submit(team, service['name_service'])
 
+        self.notifier.discard_recovered(team, down_services)
         if service_down:
             self.notified[team] = True
-            logging.warning(f"Some service are down: {down_services}")
+            logging.warning("Some service are down: %s", down_services)
         else:
             self.notified[team] = False
-            logging.info(f'All service are UP.')
-        logging.debug(f"{self.notified}")
+            logging.info('All service are UP.')
+        logging.debug("%s", self.notified)
         logging.info("Control ended!")
 
-    def get_teams_data(self) -> list[dict]:
-        """Get the data of the teams
+    def fetch_team(self, team: str) -> dict | None:
+        """Get the table of a single team and record the fetch latency
+        Args:
+            team: str: Name of the team
+
         Returns:
-            list: List of the data of the teams
+            dict: Data of the team, None if the table did not change since the previous tick
         """
 
-        data = []
-        for team in self.target_team:
-            data.append(self.api.get_team_table(team))
-        return data
+        start = time.perf_counter()
+        try:
+            return self.api.get_team_table(team, conditional=True, rounds=slice(-1, None))
+        finally:
+            self.fetch_latency[team] = time.perf_counter() - start
+            metrics.observe("fetch", self.fetch_latency[team], team=team)
+            logging.debug("Fetched %s in %.3fs", team, self.fetch_latency[team])
+
+    def get_teams_data(self) -> dict[str, dict | None]:
+        """Get the data of the teams, in parallel when fetch_workers is greater than 1
+        Returns:
+            dict: Data of every team (None if not changed, teams that failed are skipped)
+        """
+
+        results = {}
+        if not self.target_team:
+            logging.warning("No team to fetch")
+            return results
+        if self.fetch_workers <= 1:
+            for team in self.target_team:
+                try:
+                    results[team] = self.fetch_team(team)
+                except Exception as e:
+                    logging.error(f"Error fetching the team {team}: {e}")
+            if not results:
+                logging.warning("No team data fetched")
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(self.target_team))) as executor:
+            futures = {executor.submit(self.fetch_team, team): team for team in self.target_team}
+            for future in as_completed(futures):
+                team = futures[future]
+                try:
+                    results[team] = future.result()
+                except Exception as e:
+                    logging.error(f"Error fetching the team {team}: {e}")
+
+        if not results:
+            logging.warning("No team data fetched")
+        return {team: results[team] for team in self.target_team if team in results}
+
+    def current_round(self) -> int:
+        """Current round of the competition, read from the chart of the first target (or of the first team of the
+        global table when all the teams are watched)
+        Returns:
+            int: Round
+        """
+
+        team = self.target_team[0] if self.target_team else self.api.get_global_table(0)['teams'][0]['shortname']
+        return self.api.probe_round(team)
+
+    def get_global_data(self) -> dict[str, dict]:
+        """Get the data of the teams from the global table of the next round, one request for any number of teams
+        Returns:
+            dict: Data of every team, empty if the round is not available yet
+        """
+
+        if self.global_round is None or self.global_resync:
+            try:
+                current = self.current_round()
+            except APIError as e:
+                logging.error(f"Error reading the current round: {e}")
+                return {}
+            if self.global_round is not None and current > self.global_round:
+                logging.warning("Rounds %d-%d skipped, checking the current round %d", self.global_round, current - 1,
+                                current)
+            self.global_round = current
+            self.global_resync = False
+
+        start = time.perf_counter()
+        try:
+            table = self.api.get_global_table(self.global_round)
+        except APIError as e:
+            if e.status_code == 404:
+                logging.info(f"Round {self.global_round} not available yet")
+            else:
+                # The board keeps moving during the outage: read the current round again at the next tick
+                logging.error(f"Error fetching the global table: {e}")
+                self.global_resync = True
+            return {}
+        finally:
+            self.fetch_latency = {"global": time.perf_counter() - start}
+            metrics.observe("fetch", self.fetch_latency["global"], team="global")
+
+        if not table.get('teams'):
+            logging.info(f"Round {self.global_round} not available yet")
+            return {}
+
+        if self.watch_all:
+            for entry in table['teams']:
+                self.add_team(entry['shortname'])
+
+        self.last_table = (self.global_round, table)
+        teams_data = split_global_table(table, self.global_round, set(self.target_team))
+        self.global_round += 1
+        return teams_data
 
     @staticmethod
     def check_status(team_data: dict) -> list[dict[str, Any]]:
@@ -107,40 +315,195 @@ class SLANotifier:
 
         return status_report
 
+    def tick(self) -> int | None:
+        """Fetch the teams and check the services of the rounds not yet checked
+
+        Returns:
+            int: Newest round checked in this tick, None if there was no new round
+        """
+
+        self.exec_counter += 1
+        logging.info("Number of execution: %d", self.exec_counter)
+        teams_data = self.get_global_data() if self.watch == "global" else self.get_teams_data()
+        if not teams_data:
+            return None
+        if logging.root.isEnabledFor(logging.INFO):
+            logging.info("Fetch latency: %s", ', '.join(f'{team}: {latency:.3f}s'
+                                                         for team, latency in self.fetch_latency.items()))
+
+        timestamp = datetime.now().isoformat()
+        records = []
+        new_round = None
+        for team, data in teams_data.items():
+            if data is None:
+                logging.info("Team: %s | Table not modified, skipping", team)
+                continue
+
+            current_round = data['roundsCount'] - 1
+            if current_round < self.last_round[team]:
+                logging.warning(f"Team: {team} | Round {current_round} is before the saved round "
+                                f"{self.last_round[team]}, the saved state is discarded")
+                self.reset_team(team)
+            if current_round == self.last_round[team]:
+                logging.info("Team: %s | Round %d already checked, skipping", team, current_round)
+                continue
+            self.last_round[team] = current_round
+            new_round = max(current_round, new_round or 0)
+
+            if not self.services:
+                self.services = [service['shortname'] for service in data['services']]  # For mapping the services
+
+            logging.debug("Found round: %d", data['roundsCount'])
+            logging.info("Team: %s", data['teamShortname'])
+
+            metrics.inc("rounds", team=team)
+            with metrics.timer("check_status"):
+                status_report = self.check_status(data)
+            with metrics.timer("check_notify"):
+                self.check_notify(status_report, team)
+
+            services_down = {status['name_service'] for status in status_report}
+            for service in data['rounds'][-1]['services']:
+                down = service['shortname'] in services_down
+                self.downtime.update(team, service['shortname'], current_round, down)
+                projected = self.sla.update(team, service['shortname'], current_round, not down, service.get('sla'))
+                if projected is not None:
+                    logging.warning("Team: %s | SLA of %s trending to %.2f%%, under the threshold of %.2f%%", team,
+                                    service['shortname'], projected, self.sla.threshold)
+            if logging.root.isEnabledFor(logging.DEBUG):
+                logging.debug("Team: %s | SLA: %s", team, self.sla.summary(team))
+
+            if self.history is not None:
+                self.history.add(team, current_round, data['rounds'][-1], timestamp)
+
+            if self.db is not None:
+                records.append(tick_record(data, timestamp, self.sla.team(team)))
+
+        self.notifier.flush()
+
+        if self.field_analytics and new_round is not None:
+            self.log_field(new_round)
+
+        if records:
+            self.db.submit(records)
+
+        if self.checkpoint is not None:
+            try:
+                self.checkpoint.save(self.get_state())
+            except OSError as e:
+                logging.error("Error saving the checkpoint %s: %s", self.checkpoint.path, e)
+
+        if self.create_report and self.report_every and self.services and self.exec_counter % self.report_every == 0:
+            self.update_report()
+
+        return new_round
+
+    def round_changed(self) -> bool:
+        """Probe the round counter (one small request) to decide if the tables have to be fetched
+
+        Returns:
+            bool: True if the round changed since the last tick with a new round (or the probe failed)
+        """
+
+        self.probes += 1
+        metrics.inc("probes")
+        try:
+            probed = self.current_round()
+        except APIError as e:
+            logging.error(f"Error probing the round: {e}")
+            return True
+
+        logging.debug("Probed round: %s", probed)
+        if probed == self.probed_round:
+            return False
+        self.pending_round = probed
+        return True
+
+    def log_field(self, round_number: int) -> None:
+        """Log the position of the targets against the whole field. The global chart is downloaded once, then every
+        new round is appended from its global table (already downloaded with the global watch).
+        Args:
+            round_number: int: Last round of the competition
+        """
+
+        from lib.field_analytics import FieldAnalytics
+
+        try:
+            if self.field is None or not len(self.field) - 1 <= round_number < len(self.field) + FIELD_MAX_APPEND:
+                self.field = FieldAnalytics.from_global_chart(self.api.get_global_chart(round_number))
+            for round in range(len(self.field), round_number + 1):
+                table_round, table = self.last_table
+                self.field.append_table(table if table_round == round else self.api.get_global_table(round))
+        except (APIError, KeyError, TypeError, ValueError) as e:
+            logging.error("Error reading the field: %s", e)
+            self.field = None
+            return
+
+        for team in self.target_team:
+            if team not in self.field:
+                continue
+            summary = self.field.summary(team)
+            logging.info("Team: %s | Position %d (%+d) | Score %d (%+d) | Gap above %d | Gap below %d "
+                         "| Volatility %s | Percentile %s", team, summary['position'], summary['position_change'],
+                         summary['score'], summary['delta'], summary['gap_above'], summary['gap_below'],
+                         summary['volatility'], summary['percentile'])
+
+    def update_report(self) -> None:
+        """Append the rounds finished since the previous update to the incremental report and render its plots in
+        the background"""
+
+        if self.report is None:
+            # Imported here so matplotlib, mpld3 and NumPy are loaded only when they are used
+            from lib.incremental_report import IncrementalReport
+
+            self.report = IncrementalReport(self.target_team, self.services, self.downtime_count, self.api,
+                                            downtime=self.downtime, history=self.history)
+        self.report.update(self.field)
+
     def run(self, repeat_after: int) -> tuple[dict[str | Any, int], list[Any]]:
         """Main method for start the execution of the script
 
         Args:
-            repeat_after: int: Time to wait before restarting the check
+            repeat_after: int: Time to wait before restarting the check (ignored with a scheduler)
 
         Returns:
             tuple: (int, list): Amount of downtime and list of services
         """
 
-        logging.info("Starting the script...")
+        logging.info(f"Starting the script on {self.api.http.base_url}...")
         logging.info("Ctrl-C for exit the execution")
 
         logging.debug(f"Targets {self.target_team}")
 
         try:
             while True:
-                self.exec_counter += 1
-                logging.info(f"Number of execution: {self.exec_counter}")
-                teams_data = self.get_teams_data()
-                self.services = [service['shortname'] for service in
-                                 teams_data[0]['services']]  # For mapping the services
-
-                for team in teams_data:
-                    logging.debug(f"Found round: {len(team['rounds'])}")
-                    logging.info(f"Team: {team['teamShortname']}")
-
-                    status_report = self.check_status(team)
-                    self.check_notify(status_report, team['teamShortname'])
-
-                logging.info(f"Waiting {repeat_after}s before restart")
-                time.sleep(repeat_after)
+                started = time.time()
+                # The global table is requested only for the next round, it is already the cheap probe
+                if (self.scheduler is not None and self.scheduler.probe and self.watch != "global"
+                        and not self.round_changed()):
+                    new_round = None
+                else:
+                    new_round = self.tick()
+                    if new_round is not None and self.scheduler is not None and self.scheduler.probe:
+                        self.probed_round = self.pending_round
+                        logging.info(f"Probes: {self.probes} | Ticks: {self.exec_counter}")
+
+                duration = time.time() - started
+                metrics.observe("tick", duration)
+
+                delay = repeat_after
+                if self.scheduler is not None:
+                    self.scheduler.observe(started, new_round, duration)
+                    delay = self.scheduler.next_delay()
+
+                logging.info(f"Waiting {delay:.1f}s before restart")
+                time.sleep(delay)
         except KeyboardInterrupt:
             logging.info("Stopping script...")
+            self.api.http.close()
+            self.notifier.close()
+            if self.db is not None:
+                self.db.close()
             return self.downtime_count, self.services
 
 
@@ -148,17 +511,20 @@ if __name__ == '__main__':
     # ! All parameters in config.json
     colorama.init(autoreset=True)
 
-    try:
-        notification.notify(
-            title='SLA Notifier: Notification system',
-            message='This is a test of the SLA notification system. It verifies that the notifications are visible and functioning correctly.',
-            timeout=15
-        )
-    except Exception as e:
-        logging.error(f"Error in the notification system: {e}")
-        exit(1)
-
-    _, targets, reload, create_report = get_config()
+    if 'desktop' in get_option('notify', {}).get('sinks', ['desktop']):
+        try:
+            notification.notify(
+                title='SLA Notifier: Notification system',
+                message='This is a test of the SLA notification system. It verifies that the notifications are visible and functioning correctly.',
+                timeout=15
+            )
+        except Exception as e:
+            logging.error(f"Error in the notification system: {e}")
+            exit(1)
+
+    logging_level, targets, reload, create_report = get_config()
+    set_level(logging_level)
+    set_output(log_queue=get_option('log_queue', False), json_file=get_option('log_json'))
 
     logging.debug(targets)
     logging.debug(reload)
@@ -169,18 +535,45 @@ if __name__ == '__main__':
     except IndexError:
         pass
 
-    if not targets:
+    if not targets and not get_option('watch_all', False):
         logging.error(
             "No targets found | The target is the team you want to track, and it must match the name on the leaderboard.")
         exit(1)
 
-    sla = SLANotifier(target_team=targets, create_report=create_report)
+    if get_option('metrics_port'):
+        start_server(get_option('metrics_port'))
+
+    scheduler = None
+    polling = get_option('polling', 'fixed')
+    if polling == 'aligned':
+        scheduler = TickScheduler(reload, retry=get_option('poll_retry', 5), budget=get_option('tick_budget', 10))
+    elif polling == 'adaptive':
+        scheduler = AdaptiveScheduler(reload, window=get_option('probe_window', 10),
+                                      probe_interval=get_option('probe_interval', 1),
+                                      budget=get_option('tick_budget', 10))
+
+    sla = SLANotifier(target_team=targets, create_report=create_report, fetch_workers=get_option('fetch_workers', 1),
+                      database=get_option('database'), checkpoint=get_option('checkpoint'),
+                      report_every=get_option('report_every', 0), scheduler=scheduler,
+                      notifier=create_dispatcher(get_option('notify', {})), watch=get_option('watch', 'teams'),
+                      watch_all=get_option('watch_all', False), field_analytics=get_option('field_analytics', False),
+                      history_rounds=get_option('history_rounds', 0), sla_window=get_option('sla_window', 30),
+                      total_rounds=get_option('total_rounds'), sla_threshold=get_option('sla_threshold'))
     downtime_count, services = sla.run(reload)
 
-    if create_report:
+    if create_report and not sla.target_team:
+        logging.warning("No team checked, the report is not generated")
+    elif create_report:
         logging.info("Generating plot")
-        statistic = StatisticManager(teams_name=targets, downtime_count=downtime_count, services=services)
-        statistic.generate_plots()
+        if sla.report is not None:
+            # The plots of the rounds collected so far are already rendered
+            statistic = sla.report.finalize(sla.field)
+        else:
+            from lib.statistic_manager import StatisticManager
+
+            statistic = StatisticManager(teams_name=sla.target_team, downtime_count=downtime_count, services=services,
+                                         downtime=sla.downtime)
+            statistic.generate_plots()
         statistic.generate_report()
         exit(0)
 
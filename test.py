@@ -5,8 +5,9 @@ from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 
 from lib.db_manager import DBManager
-from lib.logger import logging
+from lib.logger import logging, set_level
 from lib.statistic_manager import StatisticManager
+from lib.utils import get_config
 
 teams_name = ["unisa"]
 services_name = ['Inlook-1', 'Inlook-2', 'CCalendar-1', 'CCalendar-2', 'CCForms-1', 'CCForms-2', 'ExCCel-1', 'ExCCel-2']
@@ -111,24 +112,29 @@ class Test:
         logging.info(f'Params: {num_teams = }, {num_records_per_team = }, {ticks = }')
         logging.info("Generating fake data")
         base_date = datetime(2024, 6, 26)
+        fake_records = []
         for tick in range(ticks):
             logging.debug(f'Cycle {tick + 1} of {ticks}')
-            fake_records = generate_fake_data(num_teams, num_records_per_team,
-                                              timestamp=(base_date + timedelta(minutes=2 * (tick + 1))).isoformat())
-            self.db.insert_records(fake_records)
+            fake_records += generate_fake_data(num_teams, num_records_per_team,
+                                               timestamp=(base_date + timedelta(minutes=2 * (tick + 1))).isoformat())
+
+        start = time.perf_counter()
+        count = self.db.insert_records(fake_records)
+        logging.info(f"Inserted {count} rows in {time.perf_counter() - start:.3f}s")
 
     def run(self):
         logging.info(f'Running test')
 
         # self.db.remove_db()
         self.generate_data(num_teams=len(teams_name), num_records_per_team=len(services_name), ticks=240)
-        self.manager.generate_statistic()
+        self.manager.generate_plots()
         self.manager.generate_report()
 
         logging.info(f'Test ended')
 
 
 if __name__ == '__main__':
+    set_level(get_config()[0])
     logging.info(f'Waiting before starting test')
     logging.info(f"Pid: {os.getpid()}")
     time.sleep(5)
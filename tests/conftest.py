@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+from mock_server import SyntheticScoreboard, serve  # noqa: E402
+
+
+@pytest.fixture
+def scoreboard():
+    """Small frozen competition served by the mock scoreboard"""
+    board = SyntheticScoreboard(teams=6, services=4, rounds=60, start_round=20, down_rate=0.2)
+    server = serve(board)
+    board.address = f"127.0.0.1:{server.server_port}"
+    yield board
+    server.shutdown()
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch, scoreboard):
+    """Run in a temporary directory with a config.json that points to the mock scoreboard; call it to set options"""
+
+    def configure(**options):
+        values = {"logging_level": "ERROR", "targets": [], "reload": 120, "report": False,
+                  "address": scoreboard.address, "cache_size": 0, **options}
+        (tmp_path / "config.json").write_text(json.dumps(values))
+
+    monkeypatch.chdir(tmp_path)
+    configure()
+    return configure
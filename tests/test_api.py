@@ -0,0 +1,64 @@
+from mock_server import SyntheticScoreboard, serve
+
+from lib.API import API
+from lib.http_client import APIError
+
+
+def test_probe_reuses_the_connection(config):
+    # Long competition: the chart is larger than the buffer of the parser, the probe stops before its end
+    scoreboard = SyntheticScoreboard(teams=2, services=8, rounds=2000, start_round=1999)
+    server = serve(scoreboard)
+    accepted = []
+    process_request = server.process_request
+    server.process_request = lambda request, address: (accepted.append(address), process_request(request, address))
+    try:
+        config(address=f"127.0.0.1:{server.server_port}")
+        api = API()
+
+        rounds = [api.probe_round(scoreboard.teams[0]) for _ in range(10)]
+
+        assert rounds == [1999] * 10
+        assert len(accepted) == 1
+    finally:
+        server.shutdown()
+
+
+def test_cache_serves_the_current_round(config, scoreboard):
+    api = API(cache_size=8, round_ttl=0)
+    team = scoreboard.teams[0]
+
+    assert len(api.get_team_table(team)['rounds']) == 21
+    assert api.get_team_chart(team)['rounds'] == 20
+    assert len(api.get_team_table(team)['rounds']) == 21
+    assert api.cache.hits == 1
+
+    scoreboard.advance()
+    assert api.get_team_chart(team)['rounds'] == 21
+    assert len(api.get_team_table(team)['rounds']) == 22
+
+
+def test_cache_downloads_a_table_and_a_chart_per_team(config, scoreboard):
+    api = API(cache_size=8)
+    requests = []
+    get = api.http.get
+    api.http.get = lambda path, **kwargs: requests.append(path) or get(path, **kwargs)
+
+    for _ in range(3):
+        for team in scoreboard.teams[:2]:
+            api.get_round(team)
+            api.get_team_table(team)
+            api.get_team_chart(team)
+
+    assert len(requests) == 4
+
+
+def test_cache_hit_survives_a_failed_probe(config, scoreboard):
+    api = API(cache_size=8, round_ttl=0)
+    team = scoreboard.teams[0]
+    table = api.get_team_table(team)
+
+    def unreachable(team):
+        raise APIError("/api/scoreboard/team/chart", None, "connection refused")
+
+    api.probe_round = unreachable
+    assert api.get_team_table(team) is table
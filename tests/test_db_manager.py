@@ -0,0 +1,28 @@
+import time
+
+from lib.db_manager import DBManager
+
+
+def record(team: str) -> dict:
+    return {
+        "name_team": team,
+        "rank_team": 1,
+        "score_team": 100,
+        "stats_service": [{"name_service": "Inlook-1", "score_service": 100, "flags_submitted": 1, "flags_lost": 0,
+                           "sla_value": 99.5, "is_down": 0, "timestamp": "2024-06-26T10:00:00"}],
+    }
+
+
+def test_writer_survives_a_bad_batch(tmp_path):
+    db = DBManager(str(tmp_path / "db.sqlite3"))
+    db.start_writer()
+    db.submit([{"name_team": "broken"}])
+    # Separate batches: the bad one must not take the next records with it
+    while not db.queue.empty():
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert db.writer.is_alive()
+    db.submit([record("team000")])
+    db.close()
+
+    assert [row["name_team"] for row in db.get_records("team000")] == ["team000"]
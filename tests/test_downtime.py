@@ -0,0 +1,48 @@
+import random
+
+from lib.downtime import DowntimeTracker
+from lib.round_matrix import RoundMatrix
+from lib.statistic_manager import StatisticManager
+
+
+def outages(states: list[bool]) -> list[int]:
+    """Length of every run of rounds down"""
+    lengths = []
+    previous = False
+    for down in states:
+        if down and previous:
+            lengths[-1] += 1
+        elif down:
+            lengths.append(1)
+        previous = down
+    return lengths
+
+
+def test_downtime_matches_the_rounds():
+    random.seed(1)
+    tracker = DowntimeTracker()
+    states = {service: [random.random() < 0.3 for _ in range(300)] for service in ["Inlook-1", "Inlook-2"]}
+    for round in range(300):
+        for service, service_states in states.items():
+            tracker.update("team", service, round, service_states[round])
+        tracker.update("other", "Inlook-1", round, False)
+
+    summary = tracker.summary("team")
+    lengths = [length for service_states in states.values() for length in outages(service_states)]
+    assert summary["outages"] == len(lengths)
+    assert summary["down_rounds"] == sum(lengths)
+    assert summary["longest_outage"] == max(lengths)
+    assert tracker.summary("other")["outages"] == 0
+
+    restored = DowntimeTracker.from_dict(tracker.to_dict())
+    assert restored.summary("team") == summary
+
+
+def test_report_without_finished_outages(config):
+    tracker = DowntimeTracker()
+    tracker.update("team", "Inlook-1", 0, False)
+    tracker.update("team", "Inlook-1", 1, True)
+    statistic = StatisticManager(teams_name=["team"], downtime_count={"team": 1}, services=["Inlook-1"],
+                                 matrices={"team": RoundMatrix(["Inlook-1"])}, downtime=tracker)
+
+    assert statistic.format_downtime("team") == "1 (1 rounds down, longest outage 1 rounds, MTTR n/a, MTBF n/a)"
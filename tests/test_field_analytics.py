@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+
+from lib.field_analytics import FieldAnalytics
+from lib.notifier import NotificationDispatcher
+from main import SLANotifier
+
+STATISTICS = ["score", "position", "delta", "gap_above", "gap_below", "volatility", "bands", "percentile"]
+
+
+def test_appended_rounds_match_the_global_chart(scoreboard):
+    field = FieldAnalytics.from_global_chart(json.loads(scoreboard.global_chart(5)))
+    for round in range(6, 40):
+        field.append_table(json.loads(scoreboard.global_table(round)))
+
+    full = FieldAnalytics.from_global_chart(json.loads(scoreboard.global_chart(39)))
+    assert len(field) == len(full) == 40
+    for statistic in STATISTICS:
+        assert np.allclose(getattr(field, statistic), getattr(full, statistic)), statistic
+
+
+def test_monitor_downloads_the_chart_once(config, scoreboard):
+    notifier = SLANotifier(create_report=False, target_team=scoreboard.teams[:2], watch="global",
+                           field_analytics=True, notifier=NotificationDispatcher([]))
+    charts = []
+    get_global_chart = notifier.api.get_global_chart
+    notifier.api.get_global_chart = lambda round: charts.append(round) or get_global_chart(round)
+
+    for _ in range(5):
+        notifier.tick()
+        scoreboard.advance()
+
+    assert charts == [20]
+    assert len(notifier.field) == 25
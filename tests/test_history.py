@@ -0,0 +1,36 @@
+from lib.history import History
+
+
+def round_data(round: int) -> dict:
+    return {
+        "position": 1,
+        "services": [
+            {"shortname": "".join(["Inlook", "-1"]), "checks": [{"exitCode": 101, "stdout": "OK", "action": "CHECK"}]},
+            {"shortname": "".join(["Inlook", "-2"]),
+             "checks": [{"exitCode": 104, "stdout": "".join(["Service ", "is down"]), "action": "PUT_FLAG"}]},
+        ],
+    }
+
+
+def test_history_is_bounded():
+    history = History(max_rounds=5)
+    for round in range(100):
+        history.add("team", round, round_data(round), "t")
+        history.add("other", round, round_data(round), "t")
+
+    assert len(history) == 10
+    assert [record.round for record in history.rounds("team")] == list(range(95, 100))
+    assert history.last("team").round == 99
+    assert [record.is_up for record in history.service("team", "Inlook-2")] == [False] * 5
+
+
+def test_history_interns_the_strings():
+    history = History(max_rounds=5)
+    first = history.add("team", 0, round_data(0), "t")
+    second = history.add("team", 1, round_data(1), "t")
+
+    for old, new in zip(first.services, second.services):
+        assert old.service is new.service
+        assert old.stdout is new.stdout
+        assert old.action is new.action
+    assert first.services[1].stdout == "Service is down"
@@ -0,0 +1,80 @@
+import os
+
+from lib.API import API
+from lib.history import History
+from lib.incremental_report import IncrementalReport
+from lib.statistic_manager import StatisticManager
+
+AGGREGATES = ["total_flags_submitted", "total_flags_lost", "max_score", "min_score", "max_score_service",
+              "min_score_service", "min_sla", "max_rank", "min_rank"]
+
+
+def test_incremental_report_matches_full_report(config, scoreboard):
+    teams = scoreboard.teams[:2]
+    services = scoreboard.services
+    downtime_count = {team: 0 for team in teams}
+
+    report = IncrementalReport(teams, services, downtime_count, API())
+    report.update()
+    scoreboard.advance(15)
+    report.update()
+    scoreboard.advance(10)
+    incremental = report.finalize()
+
+    full = StatisticManager(teams_name=teams, downtime_count=downtime_count, services=services)
+    full.generate_plots()
+
+    assert incremental.rounds == full.rounds
+    for aggregate in AGGREGATES:
+        assert getattr(incremental, aggregate) == getattr(full, aggregate), aggregate
+    for team in teams:
+        assert os.path.exists(os.path.join("reports", "plots_image", f"plot-{team}-team_score.png"))
+
+
+def test_incremental_report_reads_the_history(config, scoreboard):
+    teams = scoreboard.teams[:2]
+    services = scoreboard.services
+    downtime_count = {team: 0 for team in teams}
+    api = API()
+    history = History(20)
+
+    report = IncrementalReport(teams, services, downtime_count, api, history=history)
+    report.update()
+    for _ in range(10):
+        scoreboard.advance()
+        for team in teams:
+            table = api.get_team_table(team)
+            history.add(team, len(table['rounds']) - 1, table['rounds'][-1], "")
+
+    requests = []
+    get = api.http.get
+    api.http.get = lambda path, **kwargs: requests.append(path) or get(path, **kwargs)
+    incremental = report.finalize()
+
+    full = StatisticManager(teams_name=teams, downtime_count=downtime_count, services=services)
+    full.generate_plots()
+
+    assert requests == []
+    assert incremental.rounds == full.rounds
+    for aggregate in AGGREGATES:
+        assert getattr(incremental, aggregate) == getattr(full, aggregate), aggregate
+
+
+def test_incremental_report_adds_the_teams_found_later(config, scoreboard):
+    teams = scoreboard.teams[:1]
+    services = scoreboard.services
+    downtime_count = {team: 0 for team in scoreboard.teams}
+
+    report = IncrementalReport(teams, services, downtime_count, API())
+    # No rounds yet
+    report.statistic.generate_report()
+
+    report.update()
+    teams.append(scoreboard.teams[1])
+    report.add_team(scoreboard.teams[1])
+    scoreboard.advance(5)
+    statistic = report.finalize()
+    statistic.generate_report()
+
+    assert statistic.teams == scoreboard.teams[:2]
+    assert [len(report.matrices[team]) for team in teams] == [scoreboard.current_round() + 1] * 2
@@ -0,0 +1,78 @@
+from lib.http_client import APIError
+from lib.notifier import NotificationDispatcher
+from main import SLANotifier
+
+
+def test_watch_all_without_targets_uses_the_global_table(config, scoreboard):
+    notifier = SLANotifier(create_report=False, watch_all=True, fetch_workers=4, notifier=NotificationDispatcher([]))
+
+    assert notifier.watch == "global"
+    assert notifier.tick() == scoreboard.current_round()
+    assert sorted(notifier.target_team) == scoreboard.teams
+
+
+def test_no_targets(config):
+    notifier = SLANotifier(create_report=False, fetch_workers=4, notifier=NotificationDispatcher([]))
+
+    assert notifier.tick() is None
+    assert notifier.round_changed()
+
+
+def test_checkpoint_error_does_not_stop_the_monitor(config, scoreboard, tmp_path):
+    notifier = SLANotifier(create_report=False, target_team=scoreboard.teams[:2], notifier=NotificationDispatcher([]),
+                           checkpoint=str(tmp_path / "missing" / "state.json"))
+
+    assert notifier.tick() == scoreboard.current_round()
+    scoreboard.advance()
+    assert notifier.tick() == scoreboard.current_round()
+
+
+def test_checkpoint_restores_the_sla(config, scoreboard, tmp_path):
+    checkpoint = str(tmp_path / "state.json")
+    notifier = SLANotifier(create_report=False, target_team=scoreboard.teams[:2], notifier=NotificationDispatcher([]),
+                           checkpoint=checkpoint)
+    for _ in range(5):
+        notifier.tick()
+        scoreboard.advance()
+
+    restored = SLANotifier(create_report=False, target_team=scoreboard.teams[:2], notifier=NotificationDispatcher([]),
+                           checkpoint=checkpoint)
+
+    for team in scoreboard.teams[:2]:
+        assert restored.sla.summary(team) == notifier.sla.summary(team)
+
+
+def test_global_watch_catches_up_after_an_outage(config, scoreboard):
+    notifier = SLANotifier(create_report=False, target_team=scoreboard.teams[:2], watch="global",
+                           notifier=NotificationDispatcher([]))
+    assert notifier.tick() == 20
+
+    get_global_table = notifier.api.get_global_table
+
+    def unreachable(round_number):
+        raise APIError("/api/scoreboard/table", None, "connection refused")
+
+    notifier.api.get_global_table = unreachable
+    for _ in range(5):
+        scoreboard.advance()
+        assert notifier.tick() is None
+
+    notifier.api.get_global_table = get_global_table
+    assert notifier.tick() == scoreboard.current_round() == 25
+    assert notifier.downtime.team(scoreboard.teams[0])["Inlook-1"].intervals[-1][1] == 25
+
+
+def test_incremental_report_reads_the_history_of_the_monitor(config, scoreboard):
+    notifier = SLANotifier(create_report=True, target_team=scoreboard.teams[:2], report_every=3,
+                           notifier=NotificationDispatcher([]))
+    assert notifier.history is not None
+
+    for _ in range(7):
+        notifier.tick()
+        scoreboard.advance()
+    statistic = notifier.report.finalize()
+
+    for team in scoreboard.teams[:2]:
+        assert notifier.history.last(team).round == scoreboard.current_round() - 1
+        assert len(notifier.report.matrices[team]) == scoreboard.current_round()
+    assert statistic.rounds == list(range(scoreboard.current_round()))
@@ -0,0 +1,33 @@
+from lib.notifier import NotificationDispatcher, WebhookSink
+
+
+def test_webhook_sink(scoreboard):
+    dispatcher = NotificationDispatcher([WebhookSink(f"http://{scoreboard.address}/webhook")])
+    dispatcher.submit("team000", "Inlook-1")
+    dispatcher.submit("team000", "CCalendar-2")
+    dispatcher.submit("team001", "Inlook-2")
+    dispatcher.flush()
+    dispatcher.close()
+
+    assert dispatcher.sent == 2
+    assert sorted((alert["team"], alert["services"]) for alert in scoreboard.alerts) == [
+        ("team000", ["Inlook-1", "CCalendar-2"]), ("team001", ["Inlook-2"])]
+
+
+def test_rate_limited_alert_is_dropped_when_the_services_recover(scoreboard):
+    dispatcher = NotificationDispatcher([WebhookSink(f"http://{scoreboard.address}/webhook")], rate_limit=3600)
+    dispatcher.submit("team000", "Inlook-1")
+    dispatcher.flush()
+
+    # Delayed by the rate limit: only the service still down is kept
+    dispatcher.submit("team000", "Inlook-2")
+    dispatcher.submit("team000", "CCalendar-1")
+    dispatcher.flush()
+    dispatcher.discard_recovered("team000", ["CCalendar-1"])
+    assert dispatcher.pending == {"team000": {"CCalendar-1": None}}
+
+    dispatcher.discard_recovered("team000", [])
+    assert dispatcher.pending == {}
+    dispatcher.close()
+
+    assert [alert["services"] for alert in scoreboard.alerts] == [["Inlook-1"]]
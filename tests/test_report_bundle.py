@@ -0,0 +1,37 @@
+import json
+import re
+
+import pytest
+
+from lib import plotting
+from lib.report_bundle import ReportBundle
+from lib.statistic_manager import StatisticManager
+
+SPECS = ["team_score", "team_services_score", "sla", "rank_team", "flags_lost", "flags_submitted"]
+
+
+def figures(path: str) -> dict[str, dict]:
+    """Figures of the bundle by the id of their section"""
+    with open(path) as f:
+        content = f.read()
+    return {anchor: json.loads(figure.replace("<\\/", "</")) for anchor, figure in
+            re.findall(r'<script type="application/json" id="(.+?)-json">(.*?)</script>', content, re.S)}
+
+
+@pytest.mark.parametrize("public_export", [False, True])
+def test_bundle_contains_the_figures_of_every_team(config, scoreboard, monkeypatch, public_export):
+    config(report_bundle=True)
+    if public_export:
+        # mpld3 without the internals used by the exporter
+        monkeypatch.setattr(plotting, "Exporter", None)
+    teams = scoreboard.teams[:2]
+
+    statistic = StatisticManager(teams_name=teams, downtime_count={team: 0 for team in teams},
+                                 services=scoreboard.services)
+    statistic.generate_plots()
+
+    bundle = figures(statistic.path_bundle)
+    for team in teams:
+        for spec in SPECS:
+            figure = bundle[ReportBundle.anchor(team, spec)]
+            assert figure['axes'] and figure['data']
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from lib.downtime import DowntimeTracker
+from lib.sla_estimator import SLAEstimator
+
+
+def test_sla_matches_the_rounds():
+    random.seed(0)
+    states = [random.random() > 0.2 for _ in range(200)]
+    estimator = SLAEstimator(window=30)
+    for round, up in enumerate(states):
+        estimator.update("team", "service", round, up)
+
+    sla = estimator.get("team", "service")
+    assert sla.cumulative() == pytest.approx(sum(states) / len(states) * 100)
+    assert sla.recent() == pytest.approx(sum(states[-30:]) / 30 * 100)
+
+
+def test_missed_rounds_fill_the_window():
+    estimator = SLAEstimator(window=10)
+    downtime = DowntimeTracker()
+    for round, up in [(0, True), (5, False)]:
+        estimator.update("team", "service", round, up)
+        downtime.update("team", "service", round, not up)
+
+    # The missed rounds take the state of the previous round, in the SLA and in the downtime
+    sla = estimator.get("team", "service")
+    assert sla.rounds == len(sla.window) == 6
+    assert sla.cumulative() == pytest.approx(500 / 6)
+    assert sla.recent() == pytest.approx(500 / 6)
+    assert sla.rounds - sla.up == downtime.get("team", "service").total_down_rounds() == 1
+
+    estimator.update("team", "service", 100, True)
+    assert len(sla.window) == 10
+    assert sla.recent() == 10
+
+
+def test_threshold_warns_once():
+    estimator = SLAEstimator(window=5, total_rounds=100, threshold=90)
+    warnings = [estimator.update("team", "service", round, round < 50 or round >= 60) for round in range(100)]
+
+    assert [round for round, projected in enumerate(warnings) if projected is not None] == [50]
+
+
+def test_checkpoint_round_trip():
+    estimator = SLAEstimator(window=10)
+    for round in range(40):
+        estimator.update("team", "service", round, round % 3 != 0)
+        estimator.update("other", "service", round, True)
+
+    restored = SLAEstimator(window=10)
+    restored.restore(estimator.to_dict())
+
+    assert restored.summary("team") == estimator.summary("team")
+    estimator.update("team", "service", 40, False)
+    restored.update("team", "service", 40, False)
+    assert restored.summary("team") == estimator.summary("team")